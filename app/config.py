@@ -1,30 +1,41 @@
 import sys
 import os
+import importlib
+import importlib.abc
+import importlib.util
+
+
+class _PyQt5ToPySide6Finder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Serves `import PyQt5[.QtX]` from PySide6, only when something actually asks."""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname == "PyQt5" or fullname.startswith("PyQt5."):
+            return importlib.util.spec_from_loader(fullname, self, is_package=(fullname == "PyQt5"))
+        return None
+
+    def create_module(self, spec):
+        return None # Fresh module per alias; the real PySide6 module's __spec__/__loader__ stay untouched
+
+    def exec_module(self, module):
+        if module.__name__ == "PyQt5": return # Plain package, submodules attach themselves
+        real = importlib.import_module("PySide6." + module.__name__.split(".", 1)[1])
+        # Thin proxy: share PySide6's names, fall back to it for anything added later
+        module.__dict__.update({k: v for k, v in vars(real).items() if not k.startswith("__")})
+        module.__getattr__ = lambda name: getattr(real, name)
+
 
 def setup_qt_backend():
     # --- FORCE PYSIDE6 BACKEND ---
-    sys.modules["PyQt5"] = None
-    sys.modules["PyQt5.QtCore"] = None
-    sys.modules["PyQt5.QtGui"] = None
-    sys.modules["PyQt5.QtWidgets"] = None
-
     os.environ["QT_API"] = "pyside6"
     os.environ["PYVISTA_QT_BACKEND"] = "pyside6"
 
-    try:
-        import PySide6
-        from PySide6 import QtWidgets, QtCore, QtGui
-        
-        class MockModule: pass
-        pyqt5 = MockModule()
-        pyqt5.QtWidgets = QtWidgets
-        pyqt5.QtCore = QtCore
-        pyqt5.QtGui = QtGui
-        
-        sys.modules["PyQt5"] = pyqt5
-        sys.modules["PyQt5.QtWidgets"] = QtWidgets
-        sys.modules["PyQt5.QtCore"] = QtCore
-        sys.modules["PyQt5.QtGui"] = QtGui
-    except ImportError as e:
-        print(f"CRITICAL ERROR: {e}")
-        sys.exit(1)
\ No newline at end of file
+    if importlib.util.find_spec("PySide6") is None:
+        print("CRITICAL ERROR: No module named 'PySide6'")
+        sys.exit(1)
+
+    # Drop any real PyQt5 already loaded so the alias wins
+    for name in [n for n in sys.modules if n == "PyQt5" or n.startswith("PyQt5.")]:
+        del sys.modules[name]
+
+    if not any(isinstance(f, _PyQt5ToPySide6Finder) for f in sys.meta_path):
+        sys.meta_path.insert(0, _PyQt5ToPySide6Finder())
@@ -1,60 +1,102 @@
-from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
 import numpy as np
-from weakref import WeakKeyDictionary
+import pyvista as pv
+import vtk
+from vtk.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy
 
-class ICommand(ABC):
-    @abstractmethod
-    def execute(self): pass
-    @abstractmethod
-    def undo(self): pass
+MAX_UNDO_STEPS = 200
+
+class ICommand:
+    __slots__ = ()
+
+    def execute(self): raise NotImplementedError
+    def undo(self): raise NotImplementedError
+    def on_evicted(self): pass # Dropped off the bounded undo stack, release snapshots
 
 
 
 
 class CommandManager:
-    def __init__(self, app_interface):
-        self.undo_stack = []
-        self.redo_stack = []
+    def __init__(self, app_interface, max_steps=MAX_UNDO_STEPS):
+        self.undo_stack = deque(maxlen=max_steps)
+        self.redo_stack = deque(maxlen=max_steps)
         self.app = app_interface
 
+    def _refresh_ui(self):
+        self.app.update_undo_redo_ui()
+
+    def _push_undo(self, command):
+        if len(self.undo_stack) == self.undo_stack.maxlen:
+            evicted = self.undo_stack[0]
+            # Bezier commands don't derive from ICommand
+            on_evicted = getattr(evicted, 'on_evicted', None)
+            if on_evicted: on_evicted()
+        self.undo_stack.append(command)
+
     def execute(self, command: ICommand):
         command.execute()
-        self.undo_stack.append(command)
+        self._push_undo(command)
         self.redo_stack.clear()
-        self.app.update_undo_redo_ui()
+        self._refresh_ui()
 
     def push_existing(self, command: ICommand):
-        self.undo_stack.append(command)
+        self._push_undo(command)
         self.redo_stack.clear()
-        self.app.update_undo_redo_ui()
+        self._refresh_ui()
 
     def undo(self):
         if not self.undo_stack: return
         command = self.undo_stack.pop()
         command.undo()
         self.redo_stack.append(command)
-        self.app.update_undo_redo_ui()
+        self._refresh_ui()
 
     def redo(self):
         if not self.redo_stack: return
         command = self.redo_stack.pop()
         command.execute()
-        self.undo_stack.append(command)
-        self.app.update_undo_redo_ui()
+        self._push_undo(command)
+        self._refresh_ui()
+
+# --- RENDER BATCHING ---
+
+def _render(app):
+    # Composite commands suspend per-child renders and draw once at the end
+    if not app._render_suspended:
+        app.plotter.render()
+
+@contextmanager
+def _batched_render(app):
+    if app is None:
+        yield
+        return
+    prev = app._render_suspended
+    app._render_suspended = True
+    try:
+        yield
+    finally:
+        app._render_suspended = prev
+    _render(app)
 
 # --- CONCRETE COMMANDS ---
 
 class MultiCommand(ICommand):
-    def __init__(self, commands_list):
+    __slots__ = ('commands', 'app')
+
+    def __init__(self, commands_list, app=None):
         self.commands = commands_list
+        self.app = app
 
     def execute(self):
-        for cmd in self.commands:
-            cmd.execute()
+        with _batched_render(self.app):
+            for cmd in self.commands:
+                cmd.execute()
 
     def undo(self):
-        for cmd in reversed(self.commands):
-            cmd.undo()
+        with _batched_render(self.app):
+            for cmd in reversed(self.commands):
+                cmd.undo()
 
 
 class ReplaceGeometryCommand(ICommand):
@@ -62,75 +104,110 @@ class ReplaceGeometryCommand(ICommand):
     Replaces the dataset of an actor with a new mesh.
     Useful for filtering operations like 'extract_largest'.
     """
+    __slots__ = ('app', 'actor', 'old_mesh', 'new_mesh')
+
     def __init__(self, app, actor, old_mesh, new_mesh):
-        # Determine if we need to call super().__init__(app) based on your Command definition
-        try:
-            super().__init__(app)
-        except:
-            self.app = app
-            
+        self.app = app
         self.actor = actor
         self.old_mesh = old_mesh
         self.new_mesh = new_mesh
 
     def execute(self):
-        # DeepCopy ensures the actor updates in place without breaking pointers
-        self.actor.mapper.dataset.DeepCopy(self.new_mesh)
-        self.app.plotter.render()
+        self._show(self.new_mesh)
 
     def undo(self):
-        self.actor.mapper.dataset.DeepCopy(self.old_mesh)
-        self.app.plotter.render()
+        self._show(self.old_mesh)
+
+    def on_evicted(self):
+        # Can no longer be undone, so the previous geometry is dead weight
+        self.old_mesh = None
+
+    def _show(self, mesh):
+        mapper = self.actor.mapper
+        if isinstance(mesh, vtk.vtkPolyData):
+            # The mapper only holds a reference, so toggling undo/redo copies nothing
+            mapper.SetInputData(mesh)
+        else:
+            mapper.dataset.DeepCopy(mesh)
+        mapper.Modified()
+        _render(self.app)
+
+
+_NOT_SCANNED = object()
+
+def _is_rgb_name(name):
+    upper = name.upper()
+    return 'RGB' in upper or 'COLOR' in upper
 
 
 class AddMeshCommand(ICommand):
+    __slots__ = ('app', 'mesh', 'name', 'texture', 'actor', '_rgb_name')
+
     def __init__(self, app, mesh, name, texture=None):
         self.app = app
         self.mesh = mesh
         self.name = name
         self.texture = texture
         self.actor = None
+        self._rgb_name = _NOT_SCANNED
+
+        # float32 from the start so later edits never have to re-cast the points
+        if mesh.GetPoints() is not None and mesh.points.dtype != np.float32:
+            pts = np.ascontiguousarray(mesh.points, dtype=np.float32)
+            mesh.GetPoints().SetData(numpy_to_vtk(pts, deep=False, array_type=vtk.VTK_FLOAT))
+
+    def _find_rgb_name(self):
+        # Scanned once per command; redo re-executes with the same mesh
+        if self._rgb_name is _NOT_SCANNED:
+            active_name = self.mesh.active_scalars_name
+            if active_name and _is_rgb_name(active_name):
+                self._rgb_name = active_name
+            else:
+                names = getattr(self.mesh, 'array_names', ())
+                self._rgb_name = next((n for n in names if _is_rgb_name(n)), None)
+        return self._rgb_name
 
     def execute(self):
         color_arg = 'white'
-        rgb_arg = False
         scalars_arg = None
         
-        if self.texture is not None:
-            color_arg = 'white'
-            rgb_arg = False
-        else:
-            active_name = self.mesh.active_scalars_name
-            found_rgb = False
-            if active_name and ('RGB' in active_name.upper() or 'COLOR' in active_name.upper()):
-                scalars_arg = active_name
-                found_rgb = True
-            
-            if not found_rgb and hasattr(self.mesh, 'array_names'):
-                for arr_name in self.mesh.array_names:
-                    if 'RGB' in arr_name.upper():
-                        self.mesh.set_active_scalars(arr_name)
-                        scalars_arg = arr_name
-                        found_rgb = True
-                        break
-            
-            if found_rgb:
+        if self.texture is None:
+            rgb_name = self._find_rgb_name()
+            if rgb_name:
+                if rgb_name != self.mesh.active_scalars_name:
+                    self.mesh.set_active_scalars(rgb_name)
+                scalars_arg = rgb_name
                 color_arg = None  
-                rgb_arg = True
         
-        try: self.app.plotter.disable_picking()
-        except: pass
-            
-        res = self.app.plotter.add_mesh(
-            self.mesh, 
-            texture=self.texture,
-            color=color_arg, 
-            scalars=scalars_arg, 
-            rgb=rgb_arg,
-            specular=0.2, diffuse=0.7, ambient=0.3, smooth_shading=True,
-            show_edges=False, name=self.name, pickable=True, reset_camera=False
-        )
-        self.actor = res[0] if isinstance(res, tuple) else res
+        self.app.reset_picker()
+
+        # Mapper + actor built by hand: add_mesh deep-copies the scalars while configuring them
+        mapper = pv.DataSetMapper(self.mesh)
+        if scalars_arg:
+            if scalars_arg in self.mesh.point_data:
+                mapper.SetScalarModeToUsePointFieldData()
+            else:
+                mapper.SetScalarModeToUseCellFieldData()
+            mapper.SelectColorArray(scalars_arg)
+            mapper.SetColorModeToDirectScalars()
+            mapper.ScalarVisibilityOn()
+        else:
+            mapper.ScalarVisibilityOff()
+
+        # smooth_shading equivalent, stored on the mesh instead of a shaded copy
+        if isinstance(self.mesh, pv.PolyData) and self.mesh.point_data.active_normals is None:
+            self.mesh.point_data.active_normals = self.mesh.point_normals
+
+        actor = pv.Actor(mapper=mapper)
+        prop = actor.prop
+        prop.SetSpecular(0.2); prop.SetDiffuse(0.7); prop.SetAmbient(0.3)
+        prop.SetInterpolationToPhong()
+        prop.EdgeVisibilityOff()
+        if color_arg: prop.color = color_arg
+        if self.texture: actor.texture = self.texture
+
+        self.app.plotter.add_actor(actor, name=self.name, pickable=True, reset_camera=False)
+        self.actor = actor
         
         if self.texture:
             self.app.original_textures[self.actor] = self.texture
@@ -139,60 +216,56 @@ class AddMeshCommand(ICommand):
         self.app.actors[self.name] = self.actor
         self.app.set_active_actor(self.actor)
         
-        if hasattr(self.app, 'hierarchy_panel'):
+        if self.app._has_hierarchy_panel:
             self.app.hierarchy_panel.add_mesh_item(self.name, self.actor)
 
     def undo(self):
         if self.actor:
             if self.app.active_actor == self.actor:
                 self.app.set_active_actor(None)
-            try: self.app.plotter.disable_picking()
-            except: pass
+            self.app.reset_picker()
             
             self.app.plotter.remove_actor(self.actor)
             self.app.enable_object_selection_mode()
             
-            if hasattr(self.app, 'hierarchy_panel'):
+            if self.app._has_hierarchy_panel:
                 self.app.hierarchy_panel.remove_mesh_item(self.name)
 
-            if self.name in self.app.actors:
-                del self.app.actors[self.name]
-            self.app.plotter.render()
+            self.app.actors.pop(self.name, None)
+            _render(self.app)
 
 class DeleteMeshCommand(ICommand):
+    __slots__ = ('app', 'name', 'actor_obj')
+
     def __init__(self, app, actor_name, actor_obj):
         self.app = app
         self.name = actor_name
         self.actor_obj = actor_obj
 
     def execute(self):
-        if hasattr(self.app, 'dental_wizard') and hasattr(self.app.dental_wizard, 'maxilla_wizard'):
-            wiz = self.app.dental_wizard.maxilla_wizard
-            if hasattr(wiz, 'bezier_tool') and wiz.bezier_tool:
-                if wiz.bezier_tool.target_actor == self.actor_obj:
-                    wiz.bezier_tool._internal_hard_reset(keep_actors=False)
-                    wiz.bezier_tool.stop()
+        if self.app._has_dental_wizard:
+            bezier_tool = self.app.dental_wizard.maxilla_wizard.bezier_tool
+            if bezier_tool and bezier_tool.target_actor == self.actor_obj:
+                bezier_tool._internal_hard_reset(keep_actors=False)
+                bezier_tool.stop()
 
         if self.app.active_actor == self.actor_obj:
             self.app.set_active_actor(None)
         
-        try: self.app.plotter.disable_picking()
-        except: pass
+        self.app.reset_picker()
             
         self.app.plotter.remove_actor(self.actor_obj)
         self.app.enable_object_selection_mode()
         
-        if self.name in self.app.actors:
-            del self.app.actors[self.name]
+        self.app.actors.pop(self.name, None)
             
-        if hasattr(self.app, 'hierarchy_panel'):
+        if self.app._has_hierarchy_panel:
             self.app.hierarchy_panel.remove_mesh_item(self.name)
             
-        self.app.plotter.render()
+        _render(self.app)
 
     def undo(self):
-        try: self.app.plotter.disable_picking()
-        except: pass
+        self.app.reset_picker()
 
         self.app.plotter.add_actor(self.actor_obj)
         self.app.enable_object_selection_mode()
@@ -200,12 +273,17 @@ class DeleteMeshCommand(ICommand):
         self.app.actors[self.name] = self.actor_obj
         self.app.set_active_actor(self.actor_obj)
         
-        if hasattr(self.app, 'hierarchy_panel'):
+        if self.app._has_hierarchy_panel:
             self.app.hierarchy_panel.add_mesh_item(self.name, self.actor_obj)
             
-        self.app.plotter.render()
+        _render(self.app)
+
+_IDENTITY_POS = (0.0, 0.0, 0.0)
+_IDENTITY_SCALE = (1.0, 1.0, 1.0)
 
 class TransformCommand(ICommand):
+    __slots__ = ('app', 'actor', 'old_matrix', 'new_matrix')
+
     def __init__(self, app, actor, old_matrix, new_matrix):
         self.app = app
         self.actor = actor
@@ -219,62 +297,176 @@ class TransformCommand(ICommand):
         self._apply_matrix(self.old_matrix)
 
     def _apply_matrix(self, matrix):
-        self.actor.user_matrix = matrix
-        self.actor.position = (0, 0, 0)
-        self.actor.orientation = (0, 0, 0)
-        self.actor.scale = (1, 1, 1)
+        actor = self.actor
+        actor.user_matrix = matrix
+        # The whole transform lives in user_matrix; only clear what the gizmo actually moved
+        if actor.GetPosition() != _IDENTITY_POS: actor.SetPosition(_IDENTITY_POS)
+        if actor.GetOrientation() != _IDENTITY_POS: actor.SetOrientation(_IDENTITY_POS)
+        if actor.GetScale() != _IDENTITY_SCALE: actor.SetScale(_IDENTITY_SCALE)
         self.app.update_gizmo_target()
         self.app.sync_highlight_motion()
-        self.app.plotter.render()
+        _render(self.app)
 
 class MultiDeleteCommand(ICommand):
+    """
+    Removes several meshes as one scene edit: picking is reset, the
+    hierarchy is updated and the view is rendered once for the whole set.
+    """
+    __slots__ = ('app', 'names', 'sub_commands')
+
     def __init__(self, app, names_list):
         self.app = app
         self.names = names_list
-        self.sub_commands = []
+        self.sub_commands = [] # (name, actor) pairs actually removed
 
     def execute(self):
-        self.sub_commands = []
-        for name in self.names:
-            if name in self.app.actors:
-                actor = self.app.actors[name]
-                cmd = DeleteMeshCommand(self.app, name, actor)
-                cmd.execute()
-                self.sub_commands.append(cmd)
+        app = self.app
+        self.sub_commands = [(n, app.actors.pop(n)) for n in self.names if n in app.actors]
+        if not self.sub_commands: return
+        removed = [actor for _, actor in self.sub_commands]
+
+        if app._has_dental_wizard:
+            bezier_tool = app.dental_wizard.maxilla_wizard.bezier_tool
+            if bezier_tool and bezier_tool.target_actor in removed:
+                bezier_tool._internal_hard_reset(keep_actors=False)
+                bezier_tool.stop()
+
+        if app.active_actor in removed:
+            app.set_active_actor(None)
+
+        app.reset_picker()
+        app.plotter.remove_actor(removed, render=False)
+        app.enable_object_selection_mode()
+
+        if app._has_hierarchy_panel:
+            app.hierarchy_panel.remove_many([n for n, _ in self.sub_commands])
+
+        _render(app)
 
     def undo(self):
-        for cmd in reversed(self.sub_commands):
-            cmd.undo()
+        if not self.sub_commands: return
+        app = self.app
+        app.reset_picker()
+
+        for name, actor in self.sub_commands:
+            app.plotter.add_actor(actor, render=False)
+            app.actors[name] = actor
+        app.enable_object_selection_mode()
+        app.set_active_actor(self.sub_commands[0][1])
+
+        if app._has_hierarchy_panel:
+            app.hierarchy_panel.add_many(self.sub_commands)
+
+        _render(app)
 
 class DeleteCellsCommand(ICommand):
-    def __init__(self, app, actor, deleted_cell_ids, original_mesh_copy):
+    """
+    Removes brushed cells from the actor's mesh.
+    The polygon cell array is compacted in place; only the removed
+    connectivity (and cell data rows) is kept for undo, points are
+    never touched by a cell deletion.
+    """
+    __slots__ = ('app', 'actor', 'ids', 'removed_sizes', 'removed_conn', 'removed_cell_data')
+
+    def __init__(self, app, actor, deleted_cell_ids):
         self.app = app
         self.actor = actor
-        self.ids = deleted_cell_ids
-        self.original_mesh = original_mesh_copy 
-        self.new_mesh = None
+        # Sorted + unique so undo can re-insert rows at their original index
+        self.ids = np.unique(np.asarray(list(deleted_cell_ids), dtype=np.int32))
+        self.removed_sizes = None
+        self.removed_conn = None
+        self.removed_cell_data = {}
+
+    @staticmethod
+    def _set_polys(mesh, sizes, conn):
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        mesh.GetPolys().SetData(
+            numpy_to_vtkIdTypeArray(offsets, deep=True),
+            numpy_to_vtkIdTypeArray(np.ascontiguousarray(conn, dtype=np.int64), deep=True)
+        )
+        # Cell map and point->cell links are stale; drop them, VTK rebuilds them when something asks
+        mesh.DeleteCells()
+        mesh.Modified()
 
     def execute(self):
         mesh = self.actor.mapper.dataset
-        self.new_mesh = mesh.remove_cells(list(self.ids))
-        
-        if self.new_mesh.points.dtype == np.float64:
-            self.new_mesh.points = self.new_mesh.points.astype(np.float32)
-        
-        self.actor.mapper.SetInputData(self.new_mesh)
-        self.actor.mapper.Update() 
-        
-        if hasattr(self.new_mesh, "compute_normals"):
-            self.new_mesh.compute_normals(inplace=True)
-            
-        self.app.plotter.render()
+        polys = mesh.GetPolys()
+        offsets = vtk_to_numpy(polys.GetOffsetsArray())
+        conn = vtk_to_numpy(polys.GetConnectivityArray())
+        sizes = np.diff(offsets)
+
+        keep = np.ones(len(sizes), dtype=bool)
+        keep[self.ids] = False
+        conn_keep = np.repeat(keep, sizes)
+
+        self.removed_sizes = sizes[self.ids].astype(np.int32)
+        self.removed_conn = conn[~conn_keep].astype(np.int32)
+
+        cell_arrays = {name: np.asarray(mesh.cell_data[name]) for name in mesh.cell_data.keys()}
+        self.removed_cell_data = {name: arr[self.ids].copy() for name, arr in cell_arrays.items()}
+
+        self._set_polys(mesh, sizes[keep], conn[conn_keep])
+        for name, arr in cell_arrays.items():
+            mesh.cell_data[name] = arr[keep]
+
+        _render(self.app)
 
     def undo(self):
-        self.actor.mapper.SetInputData(self.original_mesh)
-        self.actor.mapper.Update()
-        self.app.plotter.render()      
+        if self.removed_conn is None: return
+        mesh = self.actor.mapper.dataset
+        polys = mesh.GetPolys()
+        offsets = vtk_to_numpy(polys.GetOffsetsArray())
+        conn = vtk_to_numpy(polys.GetConnectivityArray())
+        sizes = np.diff(offsets)
+
+        # Positions in the compacted array: the i-th removed id lost i rows before it
+        slots = self.ids - np.arange(len(self.ids), dtype=np.int32)
+        conn_slots = np.repeat(offsets[slots], self.removed_sizes)
+
+        cell_arrays = {name: np.asarray(mesh.cell_data[name]) for name in mesh.cell_data.keys()}
+
+        self._set_polys(
+            mesh,
+            np.insert(sizes, slots, self.removed_sizes),
+            np.insert(conn, conn_slots, self.removed_conn)
+        )
+        for name, arr in cell_arrays.items():
+            if name in self.removed_cell_data:
+                mesh.cell_data[name] = np.insert(arr, slots, self.removed_cell_data[name], axis=0)
+            else:
+                del mesh.cell_data[name]
+
+        self._release()
+
+        _render(self.app)
+
+    def on_evicted(self):
+        self._release()
+
+    def _release(self):
+        self.removed_sizes = None
+        self.removed_conn = None
+        self.removed_cell_data = {}
+
+# (props key, vtkProperty getter) pairs captured for material undo
+_PROP_GETTERS = (
+    ('color', 'GetColor'),
+    ('diffuse', 'GetDiffuse'),
+    ('specular', 'GetSpecular'),
+    ('specular_power', 'GetSpecularPower'),
+    ('ambient', 'GetAmbient'),
+    ('interpolation', 'GetInterpolation'),
+)
+# PBR getters only exist on newer VTK builds, so they carry a fallback value
+_PBR_PROP_GETTERS = (
+    ('metallic', 'GetMetallic', 0.0),
+    ('roughness', 'GetRoughness', 1.0),
+)
 
 class MaterialChangeCommand(ICommand):
+    __slots__ = ('app', 'actor', 'new_props', 'old_props')
+
     def __init__(self, app, actor, new_props):
         self.app = app
         self.actor = actor
@@ -283,17 +475,12 @@ class MaterialChangeCommand(ICommand):
 
     def _capture_props(self, actor):
         prop = actor.GetProperty()
-        return {
-            'color': prop.GetColor(),
-            'diffuse': prop.GetDiffuse(),
-            'specular': prop.GetSpecular(),
-            'specular_power': prop.GetSpecularPower(),
-            'ambient': prop.GetAmbient(),
-            'interpolation': prop.GetInterpolation(),
-            'metallic': prop.GetMetallic() if hasattr(prop, 'GetMetallic') else 0.0,
-            'roughness': prop.GetRoughness() if hasattr(prop, 'GetRoughness') else 1.0,
-            'texture': actor.GetTexture()
-        }
+        props = {key: getattr(prop, getter)() for key, getter in _PROP_GETTERS}
+        for key, getter, default in _PBR_PROP_GETTERS:
+            method = getattr(prop, getter, None)
+            props[key] = method() if method else default
+        props['texture'] = actor.GetTexture()
+        return props
 
     def execute(self):
         self._apply(self.new_props)
@@ -318,4 +505,4 @@ class MaterialChangeCommand(ICommand):
         if 'texture' in props:
             self.actor.SetTexture(props['texture'])
             
-        self.app.plotter.render()
\ No newline at end of file
+        _render(self.app)
\ No newline at end of file
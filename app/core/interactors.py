@@ -1,4 +1,12 @@
 import vtk
+from PySide6.QtCore import QTimer
+
+HOVER_INTERVAL_MS = 16 # ~60 Hz
+
+# Base-class handlers resolved once instead of via super() on every event
+_base_mouse_move = vtk.vtkInteractorStyleTrackballCamera.OnMouseMove
+_base_left_down = vtk.vtkInteractorStyleTrackballCamera.OnLeftButtonDown
+_base_left_up = vtk.vtkInteractorStyleTrackballCamera.OnLeftButtonUp
 
 class BrushInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
     def __init__(self, parent_app):
@@ -6,22 +14,57 @@ class BrushInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
         self.AddObserver("LeftButtonPressEvent", self.on_left_down)
         self.AddObserver("LeftButtonReleaseEvent", self.on_left_up)
         self.AddObserver("MouseMoveEvent", self.on_mouse_move)
-    
+
+        # Mouse moves arrive far faster than we can pick + render, so hover/brush
+        # work runs at most once per interval using the latest event position
+        self._hover_timer = QTimer()
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(HOVER_INTERVAL_MS)
+        self._hover_timer.timeout.connect(self._do_pending_hover)
+        # Set False to stamp on every event while brushing (no gaps on fast strokes)
+        self.coalesce_strokes = True
+
+        # One picker for the style's lifetime, re-targeted only when the active mesh changes
+        self._picker = vtk.vtkCellPicker()
+        self._picker.SetTolerance(0.005)
+        self._picker.PickFromListOn()
+        self._pick_target = None
+
+    def _is_inside_screen_bounds(self, actor, x, y):
+        """Cheap reject: is (x, y) inside the actor's projected bounding box?"""
+        bounds = actor.GetBounds()
+        renderer = self.parent.plotter.renderer
+        xs = []; ys = []
+        for bx in bounds[0:2]:
+            for by in bounds[2:4]:
+                for bz in bounds[4:6]:
+                    renderer.SetWorldPoint(bx, by, bz, 1.0)
+                    renderer.WorldToDisplay()
+                    dx, dy, dz = renderer.GetDisplayPoint()
+                    # Corner behind the camera projects unreliably, fall through to the real pick
+                    if not 0.0 <= dz <= 1.0: return True
+                    xs.append(dx); ys.append(dy)
+        return min(xs) <= x <= max(xs) and min(ys) <= y <= max(ys)
+
     def _is_cursor_on_mesh(self):
         """
         Robust check: Returns True if mouse is hovering over the ACTIVE MESH.
         """
+        actor = self.parent.active_actor
+        if actor is None: return False
         x, y = self.GetInteractor().GetEventPosition()
-        
-        # Use CellPicker with "PickFromList" to ignore everything except the target mesh
-        picker = vtk.vtkCellPicker()
-        picker.SetTolerance(0.005)
-        picker.InitializePickList()
-        picker.AddPickList(self.parent.active_actor)
-        picker.PickFromListOn()
-        
-        picker.Pick(x, y, 0, self.parent.plotter.renderer)
-        return picker.GetActor() == self.parent.active_actor
+
+        if not self._is_inside_screen_bounds(actor, x, y):
+            return False
+
+        # Pick list restricted to the target mesh so everything else is ignored
+        if self._pick_target is not actor:
+            self._picker.InitializePickList()
+            self._picker.AddPickList(actor)
+            self._pick_target = actor
+
+        self._picker.Pick(x, y, 0, self.parent.plotter.renderer)
+        return self._picker.GetActor() == actor
 
     def on_left_down(self, obj, event):
         if self._is_cursor_on_mesh():
@@ -29,16 +72,29 @@ class BrushInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
             self.parent.on_brush_action(self.GetInteractor(), event)
         else:
             self.parent.is_brushing_now = False
-            super().OnLeftButtonDown()
+            _base_left_down(self)
 
     def on_left_up(self, obj, event):
+        # Stamp the last coalesced segment before the flag drops; the shot alone would only hover
+        if self._hover_timer.isActive():
+            self._hover_timer.stop()
+            self._do_pending_hover()
         self.parent.is_brushing_now = False
-        super().OnLeftButtonUp()
+        _base_left_up(self)
 
     def on_mouse_move(self, obj, event):
-        self.parent.on_brush_hover(self.GetInteractor(), event)
+        if self.parent.is_brushing_now and not self.coalesce_strokes:
+            self._do_pending_hover()
+        elif not self._hover_timer.isActive():
+            self._hover_timer.start()
+
+        if not self.parent.is_brushing_now:
+            _base_mouse_move(self)
+
+    def _do_pending_hover(self):
+        iren = self.GetInteractor()
+        if iren is None: return
+        self.parent.on_brush_hover(iren, "MouseMoveEvent")
 
         if self.parent.is_brushing_now:
-            self.parent.on_brush_action(self.GetInteractor(), event)
-        else:
-            super().OnMouseMove()
\ No newline at end of file
+            self.parent.on_brush_action(iren, "MouseMoveEvent")
@@ -2,12 +2,241 @@ import numpy as np
 import pyvista as pv
 import vtk
 import math
+import concurrent.futures
+from collections import OrderedDict, deque
+import time
 from scipy.spatial import cKDTree
-from collections import deque
 from typing import List, Set, Tuple, Optional
+from vtk.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QMenu
 from PySide6.QtGui import QCursor
 
+# --- Optional JIT ---
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+    def njit(*args, **kwargs):
+        # Kernels stay importable; callers pick the interpreted twins instead
+        if args and callable(args[0]): return args[0]
+        return lambda f: f
+
+# --- Optional embree ray tracing (trimesh + embreex/pyembree) ---
+try:
+    import trimesh
+    HAS_EMBREE = trimesh.ray.has_embree
+except ImportError:
+    HAS_EMBREE = False
+
+# Node colour states: plain, open-end, active
+NODE_PLAIN, NODE_END, NODE_ACTIVE = 0, 1, 2
+_NODE_COLORS = ((1.0, 1.0, 0.0), (0.2, 0.6, 1.0), (1.0, 0.0, 0.0))
+
+DRAG_INTERVAL_S = 1.0 / 60.0 # Node drag re-picks at most this often
+ASYNC_CURVE_POINTS = 1000 # Longer paths build their tube on a worker thread
+PATH_CACHE_BYTES = 32 * 1024 * 1024 # LRU cap for cached segment paths
+MAX_SEGMENT_SAMPLES = 4096 # Longer segments fall back to fresh arrays
+BARRIER_MAX_DEPTH = 20 # BFS hops allowed when bridging two barrier points
+
+# --- TOPOLOGY HELPERS ---
+
+def _build_point_adjacency(mesh):
+    """
+    CSR vertex adjacency (adj_off, adj_idx) through shared polygons:
+    neighbours of p are adj_idx[adj_off[p]:adj_off[p+1]].
+    """
+    n_points = mesh.n_points
+    polys = mesh.GetPolys()
+    off = vtk_to_numpy(polys.GetOffsetsArray()).astype(np.int64)
+    conn = vtk_to_numpy(polys.GetConnectivityArray()).astype(np.int64)
+    sizes = np.diff(off)
+
+    src, dst = [], []
+    for n in np.unique(sizes):
+        rows = conn[off[:-1][sizes == n][:, None] + np.arange(n)]
+        for a in range(n):
+            for b in range(n):
+                if a != b: src.append(rows[:, a]); dst.append(rows[:, b])
+    if not src:
+        return np.zeros(n_points + 1, dtype=np.int32), np.zeros(0, dtype=np.int32)
+
+    # Unique (src, dst) keys, already sorted by src
+    keys = np.unique(np.concatenate(src) * n_points + np.concatenate(dst))
+    src = keys // n_points
+    adj_off = np.zeros(n_points + 1, dtype=np.int32)
+    np.cumsum(np.bincount(src, minlength=n_points), out=adj_off[1:])
+    return adj_off, (keys % n_points).astype(np.int32)
+
+@njit(cache=True)
+def _bfs_bridge(adj_off, adj_idx, s, e, max_depth, parent, queue, qdepth):
+    """
+    Vertices strictly between s and e on a shortest path of at most
+    max_depth hops (empty if none). parent must be all -1 on entry and
+    is restored before returning so the workspace can be reused.
+    """
+    head = 0; tail = 1
+    queue[0] = s; qdepth[0] = 0; parent[s] = s
+    hit = -1
+    while head < tail and hit == -1:
+        cur = queue[head]; d = qdepth[head]; head += 1
+        if d > max_depth: continue
+        for j in range(adj_off[cur], adj_off[cur + 1]):
+            nb = adj_idx[j]
+            if nb == e:
+                hit = cur; break
+            if parent[nb] == -1:
+                parent[nb] = cur
+                queue[tail] = nb; qdepth[tail] = d + 1; tail += 1
+
+    n = 0; node = hit
+    while node != -1 and node != s:
+        n += 1; node = parent[node]
+    path = np.empty(n, dtype=np.int32)
+    node = hit
+    for k in range(n - 1, -1, -1):
+        path[k] = node; node = parent[node]
+
+    for k in range(tail):
+        parent[queue[k]] = -1
+    return path
+
+def _bfs_bridge_py(adj_off, adj_idx, s, e, max_depth):
+    """
+    Interpreted twin of _bfs_bridge: parent pointers only, the path is
+    rebuilt once e is reached instead of copied on every expansion.
+    """
+    parents = {s: -1}
+    q = deque([(s, 0)])
+    while q:
+        cur, d = q.popleft()
+        if d > max_depth: continue
+        nbrs = adj_idx[adj_off[cur]:adj_off[cur + 1]].tolist()
+        if e in nbrs:
+            path = []
+            while cur != s:
+                path.append(cur); cur = parents[cur]
+            return path[::-1]
+        for nb in nbrs:
+            if nb not in parents:
+                parents[nb] = cur
+                q.append((nb, d + 1))
+    return []
+
+def _set_polyline(poly, pts):
+    """Loads pts into poly as one polyline (poly must already own a vtkPoints)."""
+    n = len(pts)
+    poly.GetPoints().SetData(numpy_to_vtk(np.ascontiguousarray(pts), deep=True))
+    lines = vtk.vtkCellArray()
+    lines.SetCells(1, numpy_to_vtkIdTypeArray(np.concatenate(([n], np.arange(n))).astype(np.int64), deep=True))
+    poly.SetLines(lines)
+
+def _tube_filters(src):
+    """src -> vtkSplineFilter -> vtkTubeFilter, the curve's smoothing + sweep stages."""
+    spline = vtk.vtkSplineFilter()
+    spline.SetInputData(src)
+    spline.SetSubdivideToSpecified()
+    tube = vtk.vtkTubeFilter()
+    tube.SetInputConnection(spline.GetOutputPort())
+    tube.SetNumberOfSides(20)
+    tube.CappingOn()
+    return spline, tube
+
+def _build_tube_polydata(pts, radius):
+    """Standalone spline tube for pts; touches no shared VTK objects, so it can run off the UI thread."""
+    src = vtk.vtkPolyData()
+    src.SetPoints(vtk.vtkPoints())
+    _set_polyline(src, pts)
+    spline, tube = _tube_filters(src)
+    spline.SetNumberOfSubdivisions(len(pts) - 1)
+    tube.SetRadius(radius)
+    tube.Update()
+    return tube.GetOutput()
+
+# 3x3x3 block of cell offsets searched around a query's own grid cell
+_NEIGHBOR_OFFSETS = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)], dtype=np.int64)
+
+class _PointGrid:
+    """
+    Uniform grid over mesh vertices for nearest-vertex snapping.
+    The 3x3x3 neighbourhood is exact for any match closer than one cell
+    size; query() reports the rest as misses so the caller can fall back.
+    """
+    def __init__(self, points, occupancy=3.0):
+        self.points = np.asarray(points)
+        self.mins = self.points.min(0).astype(np.float64)
+        extent = np.maximum(self.points.max(0) - self.mins, 1e-9)
+        n = len(self.points)
+
+        # Volume estimate first, then rescale for the real (surface) occupancy of non-empty cells
+        h = (extent.prod() * occupancy / n) ** (1.0 / 3.0)
+        occ = n / len(np.unique(self._bin(h)))
+        keys = self._bin(h * (occupancy / occ) ** 0.5)
+
+        self.order = np.argsort(keys, kind='stable')
+        self.cell_keys, self.cell_start, self.cell_count = np.unique(keys[self.order], return_index=True, return_counts=True)
+
+    def _bin(self, h):
+        """Sets the cell size and returns each vertex's linear cell key."""
+        self.h = h
+        self.dims = np.floor_divide(self.points.max(0) - self.mins, h).astype(np.int64) + 1
+        return self._keys(np.floor_divide(self.points - self.mins, h).astype(np.int64))
+
+    def _keys(self, cells):
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def query(self, q):
+        """Returns (ids, ok): nearest vertex id per query, ok False where the grid can't vouch for it."""
+        q = np.asarray(q, dtype=np.float64)
+        m = len(q)
+        base = np.floor_divide(q - self.mins, self.h).astype(np.int64)
+
+        cand_q, cand_p = [], []
+        for off in _NEIGHBOR_OFFSETS:
+            cells = base + off
+            inside = ((cells >= 0) & (cells < self.dims)).all(1)
+            keys = self._keys(cells)
+            slot = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+            cnt = np.where(inside & (self.cell_keys[slot] == keys), self.cell_count[slot], 0)
+            total = cnt.sum()
+            if not total: continue
+            # Expand each query's [start, start+cnt) run of sorted vertex ids
+            first = np.repeat(self.cell_start[slot], cnt)
+            within = np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+            cand_q.append(np.repeat(np.arange(m), cnt))
+            cand_p.append(self.order[first + within])
+
+        ids = np.zeros(m, dtype=np.int64)
+        ok = np.zeros(m, dtype=bool)
+        if not cand_q: return ids, ok
+
+        cand_q = np.concatenate(cand_q); cand_p = np.concatenate(cand_p)
+        d_sq = ((self.points[cand_p] - q[cand_q]) ** 2).sum(1)
+        # Per query, the candidate with the smallest distance comes first after sorting
+        srt = np.lexsort((d_sq, cand_q))
+        qs, first = np.unique(cand_q[srt], return_index=True)
+        best = srt[first]
+        ids[qs] = cand_p[best]
+        ok[qs] = d_sq[best] <= self.h * self.h
+        return ids, ok
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _seg_dist_sq(p, A, B):
+    """Squared distance from point p to each segment A[i] -> B[i] (numba only)."""
+    out = np.empty(A.shape[0])
+    for i in prange(A.shape[0]):
+        abx = B[i, 0] - A[i, 0]; aby = B[i, 1] - A[i, 1]; abz = B[i, 2] - A[i, 2]
+        apx = p[0] - A[i, 0]; apy = p[1] - A[i, 1]; apz = p[2] - A[i, 2]
+        len_sq = abx*abx + aby*aby + abz*abz
+        t = 0.0
+        if len_sq > 0.0:
+            t = min(max((apx*abx + apy*aby + apz*abz) / len_sq, 0.0), 1.0)
+        dx = apx - t*abx; dy = apy - t*aby; dz = apz - t*abz
+        out[i] = dx*dx + dy*dy + dz*dz
+    return out
+
 # --- COMMANDS ---
 
 class BezierCmdAdd:
@@ -22,7 +251,7 @@ class BezierCmdAdd:
     def execute(self):
         # The tool handles the logic of "appending" vs "inserting" if insert_idx is -1
         self.added_actor, self.added_pid = self.tool._internal_add_node(self.pos, self.insert_idx)
-        self.final_idx = self.tool.nodes.index(self.added_actor)
+        self.final_idx = self.tool._actor_to_idx[id(self.added_actor)]
 
     def undo(self):
         if self.added_actor:
@@ -33,7 +262,7 @@ class BezierCmdDelete:
         self.tool = tool
         self.actor = actor
         # Snapshot state before deletion
-        self.idx = tool.nodes.index(actor) if actor in tool.nodes else -1
+        self.idx = tool._actor_to_idx.get(id(actor), -1)
         self.pid = tool.node_ids[self.idx] if self.idx != -1 else -1
         self.pos = np.array(actor.GetPosition())
         self.was_closed = tool.is_closed
@@ -108,7 +337,7 @@ class BezierInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
         picked_node = self.tool.try_pick_node()
         if picked_node:
             self.tool.active_node = picked_node
-            self.tool.active_idx = self.tool.nodes.index(picked_node)
+            self.tool.active_idx = self.tool._actor_to_idx[id(picked_node)]
             self.tool.is_dragging = True
             
             # Record start state for UndoCmd
@@ -132,9 +361,11 @@ class BezierInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
 
     def OnLeftUp(self, obj, event):
         if self.tool.is_dragging and self.tool.active_node:
+            # Catch up with any move the drag throttle skipped
+            self.tool.drag_active_node_visual(force=True)
             final_pos = np.array(self.tool.active_node.GetPosition())
             # Re-snap to closest mesh point to ensure validity
-            end_pid = self.tool.mesh.find_closest_point(final_pos)
+            end_pid = self.tool._find_closest_point(final_pos)
             
             # If position changed, push a Move Command
             if self.tool._drag_start_pid != end_pid:
@@ -146,7 +377,7 @@ class BezierInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
                 self.tool.app.command_manager.execute(cmd)
             else:
                 # Just visually snap if no effective move
-                self.tool.active_node.SetPosition(self.tool.mesh.points[end_pid])
+                self.tool.active_node.SetPosition(self.tool._pts_np[end_pid])
                 self.tool.plotter.render()
 
             self.tool.active_node = None
@@ -187,22 +418,69 @@ class BezierMarkerTool:
         self.app = app
         
         self.nodes = []       
+        self._actor_to_idx = {} # id(node actor) -> index in self.nodes
+        self._node_color_state = {} # id(node actor) -> NODE_* colour it currently shows
         self.node_ids = []    
-        self.path_cache = {}  
+        self.path_cache = OrderedDict() # LRU: (pid_a, pid_b) -> (points, aabb_min, aabb_max)
+        self._path_cache_bytes = 0
+        self._full_pts_buf = None # Concatenated path, rows refreshed per segment
+        self._seg_slices = []     # segment index -> rows of _full_pts_buf
+        self._seg_src = []        # segment array each slice was last filled from
+        # Sampling scratch reused by every _get_segment_points call
+        self._ramp = np.arange(MAX_SEGMENT_SAMPLES, dtype=np.float64)
+        self._t_scratch = np.empty(MAX_SEGMENT_SAMPLES)
+        self._interp_scratch = np.empty((MAX_SEGMENT_SAMPLES, 3))
         self.is_closed = False
         
         self.line_actor = None
+        self._curve_actor = None # Persistent spline-tube pipeline, fed new points on each update
+        self._curve_src = None
+        self._curve_spline = None
+        self._curve_tube = None
+        self._curve_n = 0
+        self._curve_mapper = None
+        self._curve_async = False  # Mapper currently shows a worker-built tube
+        # Background tube builds for long curves; only the newest waiting job is kept
+        self._curve_worker = None
+        self._curve_future = None
+        self._curve_future_gen = 0
+        self._curve_next = None
+        self._curve_gen = 0        # Bumped on every update_curve
+        self._curve_sync_gen = 0   # Gen of the last update that didn't go to the worker
+        self._curve_poll = QTimer()
+        self._curve_poll.setInterval(16)
+        self._curve_poll.timeout.connect(self._poll_curve_future)
         self.target_actor = None
         self.node_radius = 1.0 
         self.curve_color = "#e67e22" 
         
         self.mesh = None
+        self._pts_np = None     # Zero-copy view of self.mesh.points, see _bind_mesh_arrays
+        self._normals_np = None
         self.locator = None 
+        self._pt_locator = None # vtkKdTreePointLocator over self.mesh, see _build_point_locator
+        self._find_closest_point = None
+        self._ray = None        # embree intersector, preferred over the locator when available
+        self._ray_mesh = None   # mesh the intersector was built from
+        self._point_tree = None # cKDTree over self.mesh.points
+        self._tree_key = None   # (mesh, points MTime) the tree was built from
+        self._grid = None       # _PointGrid over self.mesh.points for path snapping
+        self._grid_key = None
+        self._adj_off = None    # CSR vertex adjacency for barrier stitching
+        self._adj_idx = None
+        self._adj_key = None    # (mesh, polys MTime) the adjacency was built from
         self.active_node = None      
         self.active_idx = -1
         self.is_dragging = False
         self._drag_start_pos = None
         self._drag_start_pid = -1
+        self._last_drag_t = 0.0
+        # Applies the last move when the cursor stops inside a drag tick
+        self._drag_flush = QTimer()
+        self._drag_flush.setSingleShot(True)
+        self._drag_flush.timeout.connect(self._flush_drag)
+        self._view_to_world = None # Inverse composite projection, see _display_ray
+        self._view_key = None      # (camera MTime, viewport size) it was built for
         
         self.node_picker = vtk.vtkPropPicker()
         self._style = None
@@ -220,10 +498,24 @@ class BezierMarkerTool:
             self.mesh = self.mesh.extract_surface()
             self.target_actor.mapper.SetInputData(self.mesh)
         
-        self.mesh.BuildLinks()
+        # Vertex neighbourhoods come from the CSR adjacency below, so VTK cell links aren't built here
+        self._bind_mesh_arrays()
+        self._build_point_locator()
+        self._get_point_tree()
+        self._get_point_grid()
+        self._get_adjacency()
         self.locator = vtk.vtkStaticCellLocator()
         self.locator.SetDataSet(self.mesh)
         self.locator.BuildLocator()
+
+        self._ray = None
+        if HAS_EMBREE:
+            try:
+                tri_mesh = trimesh.Trimesh(self.mesh.points, self.mesh.regular_faces, process=False)
+                self._ray = tri_mesh.ray
+                self._ray_mesh = self.mesh
+            except Exception as e:
+                print(f"Embree picking unavailable, using cell locator: {e}")
         
         if "Normals" not in self.mesh.point_data:
             self.mesh.compute_normals(inplace=True, cell_normals=True)
@@ -240,6 +532,7 @@ class BezierMarkerTool:
         self.plotter.iren.interactor.SetInteractorStyle(self._style)
         
     def stop(self):
+        self._drag_flush.stop()
         if self._prev_style:
             self.plotter.iren.interactor.SetInteractorStyle(self._prev_style)
         else:
@@ -247,6 +540,12 @@ class BezierMarkerTool:
         self.app.enable_object_selection_mode()
         self.active_node = None
         self.locator = None
+        self._pt_locator = None; self._find_closest_point = None
+        self._pts_np = self._normals_np = None
+        self._ray = None; self._ray_mesh = None
+        self._point_tree = None; self._tree_key = None
+        self._grid = None; self._grid_key = None
+        self._adj_off = self._adj_idx = self._adj_key = None
         for actor in self.plotter.actors.values(): actor.SetPickable(True)
         self.plotter.render()
 
@@ -270,18 +569,6 @@ class BezierMarkerTool:
 
     # --- GEOMETRY CALCULATION ---
 
-    def _dist_sq_to_segment(self, p, a, b):
-        """Squared distance from point p to line segment ab."""
-        ab = b - a
-        ap = p - a
-        len_sq = np.dot(ab, ab)
-        if len_sq == 0: return np.dot(ap, ap) 
-        
-        t = max(0, min(1, np.dot(ap, ab) / len_sq))
-        projection = a + t * ab
-        dist_vec = p - projection
-        return np.dot(dist_vec, dist_vec)
-
     def _resolve_insertion_index(self, hit_pos):
         """
         Determines closest segment for node insertion.
@@ -290,32 +577,46 @@ class BezierMarkerTool:
         if len(self.nodes) < 2: return -1
         
         threshold_sq = (self.node_radius * 3.5) ** 2
-        best_idx = -1
-        min_dist_sq = float('inf')
         
         count = len(self.nodes)
         loop_range = count if self.is_closed else count - 1
 
-        for i in range(loop_range):
-            pts = self._get_segment_points(i, (i+1)%count)
+        segs = [self._get_segment(i, (i+1)%count) for i in range(loop_range)]
+        # Box distance never exceeds the true distance, so segments whose AABB is already too far can't win
+        lo = np.array([seg[1] for seg in segs]); hi = np.array([seg[2] for seg in segs])
+        gap = np.maximum(np.maximum(lo - hit_pos, hit_pos - hi), 0)
+        near = np.flatnonzero((gap * gap).sum(1) < threshold_sq)
+
+        # Stack every surviving polyline sub-segment as rows A->B, remembering which node segment owns it
+        starts, ends, owners = [], [], []
+        for i in near.tolist():
+            pts = segs[i][0]
             if len(pts) < 2: continue
-            
-            # Check distance against the detailed polyline segments
-            for k in range(len(pts) - 1):
-                d_sq = self._dist_sq_to_segment(hit_pos, pts[k], pts[k+1])
-                if d_sq < min_dist_sq:
-                    min_dist_sq = d_sq
-                    best_idx = i
-        
-        if min_dist_sq < threshold_sq:
-            return best_idx
+            starts.append(pts[:-1]); ends.append(pts[1:])
+            owners.append(np.full(len(pts) - 1, i))
+        if not starts: return -1
+
+        A = np.concatenate(starts); B = np.concatenate(ends); seg_owner_idx = np.concatenate(owners)
+        if HAS_NUMBA:
+            d_sq = _seg_dist_sq(np.asarray(hit_pos, dtype=np.float64), A, B)
+        else:
+            AB = B - A
+            AP = hit_pos - A
+            len_sq = (AB * AB).sum(1)
+            t = np.clip((AP * AB).sum(1) / np.where(len_sq > 0, len_sq, 1), 0, 1)
+            proj = A + t[:, None] * AB
+            d_sq = ((hit_pos - proj) ** 2).sum(1)
+
+        k = d_sq.argmin()
+        if d_sq[k] < threshold_sq:
+            return int(seg_owner_idx[k])
             
         return -1
 
     # --- INTERNAL LOGIC ---
 
     def _internal_add_node(self, pos, insert_after_idx=-1):
-        pid = self.mesh.find_closest_point(pos)
+        pid = self._find_closest_point(pos)
         
         if self.node_ids and insert_after_idx == -1 and self.node_ids[-1] == pid:
              return self.nodes[-1], self.node_ids[-1]
@@ -325,17 +626,20 @@ class BezierMarkerTool:
             sphere, color="yellow", render_points_as_spheres=False,
             reset_camera=False, pickable=True, name=f"BezierNode_{len(self.nodes)}"
         )
-        actor.SetPosition(self.mesh.points[pid])
+        actor.SetPosition(self._pts_np[pid])
+        self._node_color_state[id(actor)] = NODE_PLAIN # add_mesh already made it yellow
         
         if insert_after_idx != -1:
             idx = insert_after_idx + 1
             self.nodes.insert(idx, actor)
             self.node_ids.insert(idx, pid)
+            self._reindex_nodes(idx)
             self._invalidate_neighbors(insert_after_idx)
             self._invalidate_neighbors(idx)
         else:
             self.nodes.append(actor)
             self.node_ids.append(pid)
+            self._actor_to_idx[id(actor)] = len(self.nodes) - 1
         
         self._update_node_colors()
         self.update_curve()
@@ -343,22 +647,24 @@ class BezierMarkerTool:
         return actor, pid
 
     def _internal_remove_node_by_actor(self, actor):
-        try:
-            idx = self.nodes.index(actor)
-            self.plotter.remove_actor(actor)
-            self._invalidate_neighbors(idx - 1)
-            self.nodes.pop(idx)
-            self.node_ids.pop(idx)
-            if len(self.nodes) < 3: self.is_closed = False
-            self._update_node_colors()
-            self.update_curve()
-            self.plotter.render()
-        except ValueError: pass
+        idx = self._actor_to_idx.get(id(actor))
+        if idx is None: return
+        self.plotter.remove_actor(actor)
+        self._invalidate_neighbors(idx - 1)
+        self.nodes.pop(idx)
+        self.node_ids.pop(idx)
+        del self._actor_to_idx[id(actor)]
+        self._reindex_nodes(idx)
+        if len(self.nodes) < 3: self.is_closed = False
+        self._update_node_colors()
+        self.update_curve()
+        self.plotter.render()
 
     def _internal_restore_node(self, actor, pid, idx, was_closed):
         self.plotter.add_actor(actor)
         self.nodes.insert(idx, actor)
         self.node_ids.insert(idx, pid)
+        self._reindex_nodes(idx)
         self.is_closed = was_closed
         self._invalidate_neighbors(idx - 1)
         self._invalidate_neighbors(idx)
@@ -369,10 +675,10 @@ class BezierMarkerTool:
     def _internal_update_node_pos(self, actor, pos, pid):
         actor.SetPosition(pos)
         try:
-            idx = self.nodes.index(actor)
-            self.node_ids[idx] = pid
+            idx = self._actor_to_idx[id(actor)]
             self._invalidate_neighbors(idx - 1)
             self._invalidate_neighbors(idx)
+            self.node_ids[idx] = pid
             self.update_curve()
             self.plotter.render()
         except: pass
@@ -381,6 +687,8 @@ class BezierMarkerTool:
         if self.line_actor: 
             self.plotter.remove_actor(self.line_actor)
             self.line_actor = None
+        self._curve_sync_gen = self._curve_gen # Drop in-flight tube builds
+        self._curve_next = None
         for name in ["Debug_Raw_Selection", "Debug_Barrier_Edge", "Debug_Hole_Fill", "Debug_Original_Overlay"]:
             self.plotter.remove_actor(name)
             
@@ -389,7 +697,10 @@ class BezierMarkerTool:
             
         self.nodes = []
         self.node_ids = []
-        self.path_cache = {}
+        self._actor_to_idx = {}
+        self._node_color_state = {}
+        self._clear_path_cache()
+        self._full_pts_buf = None
         self.is_closed = False
         self.plotter.render()
 
@@ -400,48 +711,86 @@ class BezierMarkerTool:
                 self.plotter.add_actor(actor)
             self.nodes.append(actor)
             self.node_ids.append(ids_list[i])
+        self._reindex_nodes()
         self.is_closed = closed_state
         self._update_node_colors()
         self.update_curve()
         self.plotter.render()
 
+    def _reindex_nodes(self, start=0):
+        """Refreshes _actor_to_idx for nodes[start:] after an insert or removal shifted them."""
+        for i in range(start, len(self.nodes)):
+            self._actor_to_idx[id(self.nodes[i])] = i
+
     # --- INTERACTION HELPERS ---
 
     def try_pick_node(self):
         pos = self.plotter.iren.get_event_position()
         if self.node_picker.PickProp(pos[0], pos[1], self.plotter.renderer):
             actor = self.node_picker.GetActor()
-            if actor in self.nodes: return actor
+            if id(actor) in self._actor_to_idx: return actor
         return None
 
+    def _display_ray(self, x, y):
+        """
+        World-space near/far points under display (x, y), same as two
+        SetDisplayPoint/DisplayToWorld trips but with the inverse projection
+        cached until the camera or viewport changes.
+        """
+        renderer = self.plotter.renderer
+        w, h = renderer.GetSize()
+        key = (renderer.GetActiveCamera().GetMTime(), w, h)
+        if key != self._view_key:
+            m = renderer.GetActiveCamera().GetCompositeProjectionTransformMatrix(renderer.GetTiledAspectRatio(), 0, 1)
+            self._view_to_world = np.linalg.inv([[m.GetElement(i, j) for j in range(4)] for i in range(4)])
+            self._view_key = key
+        ox, oy = renderer.GetOrigin()
+        vx = 2.0 * (x - ox) / w - 1.0; vy = 2.0 * (y - oy) / h - 1.0
+        ends = self._view_to_world @ np.array([[vx, vx], [vy, vy], [0.0, 1.0], [1.0, 1.0]])
+        ends = (ends[:3] / ends[3]).T
+        return ends[0], ends[1]
+
     def try_pick_mesh(self):
         if not self.locator: return None
         x, y = self.plotter.iren.get_event_position()
-        renderer = self.plotter.renderer
-        renderer.SetDisplayPoint(x, y, 0); renderer.DisplayToWorld()
-        near = np.array(renderer.GetWorldPoint()[:3])
-        renderer.SetDisplayPoint(x, y, 1); renderer.DisplayToWorld()
-        far = np.array(renderer.GetWorldPoint()[:3])
+        near, far = self._display_ray(x, y)
+
+        if self._ray is not None:
+            locs, _, _ = self._ray.intersects_location([near], [far - near], multiple_hits=False)
+            return np.array(locs[0]) if len(locs) else None
+
         t = vtk.mutable(0.0); world = [0.0]*3; pcoords = [0.0]*3; subId = vtk.mutable(0)
         hit = self.locator.IntersectWithLine(near, far, 0.001, t, world, pcoords, subId)
         if hit: return np.array(world)
         return None
 
-    def drag_active_node_visual(self):
+    def drag_active_node_visual(self, force=False):
+        # Mouse moves outpace pick + render; in between the node keeps its last snapped spot
+        now = time.perf_counter()
+        if not force and now - self._last_drag_t < DRAG_INTERVAL_S:
+            if not self._drag_flush.isActive():
+                self._drag_flush.start(max(1, int((DRAG_INTERVAL_S - (now - self._last_drag_t)) * 1000)))
+            return
+        self._drag_flush.stop()
+        self._last_drag_t = now
+
         hit_pos = self.try_pick_mesh()
         if hit_pos is not None:
-            pid = self.mesh.find_closest_point(hit_pos)
-            snapped_pos = self.mesh.points[pid]
+            pid = self._find_closest_point(hit_pos)
+            snapped_pos = self._pts_np[pid]
             self.active_node.SetPosition(snapped_pos)
             self.plotter.render()
 
+    def _flush_drag(self):
+        if self.is_dragging and self.active_node: self.drag_active_node_visual(force=True)
+
     def handle_right_click(self):
         node = self.try_pick_node()
         if node:
             menu = QMenu()
             menu.setStyleSheet("QMenu { background-color: #333; color: white; }")
             menu.addAction("Delete Point").triggered.connect(lambda: self.delete_node_cmd(node))
-            if self.nodes.index(node) == len(self.nodes) - 1:
+            if self._actor_to_idx[id(node)] == len(self.nodes) - 1:
                  menu.addAction("Close Loop").triggered.connect(self.close_loop)
             menu.exec_(QCursor.pos())
 
@@ -454,72 +803,193 @@ class BezierMarkerTool:
         return False
 
     def _update_node_colors(self):
+        # Only nodes whose state changed get a SetColor (and the Modified it fires)
+        state = self._node_color_state
+        last = len(self.nodes) - 1
         for i, node in enumerate(self.nodes):
-            prop = node.GetProperty()
-            if node == self.active_node: prop.SetColor(1.0, 0.0, 0.0) 
-            elif i == len(self.nodes) - 1 and not self.is_closed: prop.SetColor(0.2, 0.6, 1.0)
-            else: prop.SetColor(1.0, 1.0, 0.0)
+            if node == self.active_node: target = NODE_ACTIVE
+            elif i == last and not self.is_closed: target = NODE_END
+            else: target = NODE_PLAIN
+            if state.get(id(node)) != target:
+                node.GetProperty().SetColor(*_NODE_COLORS[target])
+                state[id(node)] = target
 
     # --- GEOMETRY HELPERS (Advanced Pathing) ---
 
-    def _invalidate_neighbors(self, idx):
+    def _clear_path_cache(self):
         self.path_cache.clear()
+        self._path_cache_bytes = 0
+
+    def _invalidate_neighbors(self, idx):
+        """Drops the cached path of segment idx (node idx -> idx+1); other segments stay cached."""
+        count = len(self.node_ids)
+        if count < 2: return
+        key = tuple(sorted((self.node_ids[idx % count], self.node_ids[(idx + 1) % count])))
+        entry = self.path_cache.pop(key, None)
+        if entry is not None: self._path_cache_bytes -= entry[0].nbytes
+
+    def _bind_mesh_arrays(self):
+        # pyvista's .points re-wraps the VTK array on every access; hot paths index this view instead
+        self._pts_np = np.asarray(self.mesh.points)
+
+    def _build_point_locator(self):
+        # Single-point snapping; kd-tree locator beats pyvista's per-call find_closest_point
+        self._pt_locator = vtk.vtkKdTreePointLocator()
+        self._pt_locator.SetDataSet(self.mesh)
+        self._pt_locator.BuildLocator()
+        self._find_closest_point = self._pt_locator.FindClosestPoint
+
+    def _get_point_tree(self):
+        """Returns the cached cKDTree, rebuilt only when the mesh or its points change."""
+        key = (self.mesh, self.mesh.GetPoints().GetMTime())
+        if self._tree_key is None or self._tree_key[0] is not key[0] or self._tree_key[1] != key[1]:
+            self._bind_mesh_arrays()
+            self._point_tree = cKDTree(self._pts_np, leafsize=32, balanced_tree=False, compact_nodes=False)
+            self._tree_key = key
+        return self._point_tree
+
+    def _get_point_grid(self):
+        """Returns the cached uniform grid, rebuilt only when the mesh or its points change."""
+        key = (self.mesh, self.mesh.GetPoints().GetMTime())
+        if self._grid_key is None or self._grid_key[0] is not key[0] or self._grid_key[1] != key[1]:
+            self._bind_mesh_arrays()
+            self._grid = _PointGrid(self._pts_np)
+            self._grid_key = key
+            self._clear_path_cache() # Cached paths were snapped to the old vertices
+        return self._grid
+
+    def _get_adjacency(self):
+        """Returns the cached CSR adjacency, rebuilt only when the mesh or its polygons change."""
+        key = (self.mesh, self.mesh.GetPolys().GetMTime())
+        if self._adj_key is None or self._adj_key[0] is not key[0] or self._adj_key[1] != key[1]:
+            self._adj_off, self._adj_idx = _build_point_adjacency(self.mesh)
+            self._adj_key = key
+        return self._adj_off, self._adj_idx
 
     def _get_segment_points(self, idx_a, idx_b):
         """
         Approximates a geodesic path between two nodes by linear interpolation 
-        snapped to the nearest mesh vertices using cKDTree.
+        snapped to the nearest mesh vertices (uniform grid, cKDTree fallback).
         """
+        return self._get_segment(idx_a, idx_b)[0]
+
+    def _get_segment(self, idx_a, idx_b):
+        """Cached (points, aabb_min, aabb_max) of the segment between two nodes."""
+        grid = self._get_point_grid()
         pid_a, pid_b = self.node_ids[idx_a], self.node_ids[idx_b]
         key = tuple(sorted((pid_a, pid_b)))
-        if key in self.path_cache: return self.path_cache[key]
+        entry = self.path_cache.get(key)
+        if entry is not None:
+            self.path_cache.move_to_end(key)
+            return entry
         
-        p_a, p_b = self.mesh.points[pid_a], self.mesh.points[pid_b]
-        dist = np.linalg.norm(p_b - p_a)
+        p_a, p_b = self._pts_np[pid_a], self._pts_np[pid_b]
+        dx, dy, dz = (p_b - p_a).tolist()
+        dist = math.sqrt(dx*dx + dy*dy + dz*dz)
         
         # Density: Approx one point every 0.5 units, min 10 points
         num = int(max(10, dist / 0.5))
-        t = np.linspace(0, 1, num)
+        if num <= MAX_SEGMENT_SAMPLES:
+            ramp, t, interp = self._ramp[:num], self._t_scratch[:num], self._interp_scratch[:num]
+        else:
+            ramp, t, interp = np.arange(num, dtype=np.float64), np.empty(num), np.empty((num, 3))
+        np.divide(ramp, num - 1, out=t) # linspace(0, 1, num) without allocating
         
         # Linear interp
-        interp = p_a + np.outer(t, (p_b - p_a))
+        np.multiply(t[:, None], p_b - p_a, out=interp)
+        interp += p_a
         
-        # Snap to mesh
-        _, ids = cKDTree(self.mesh.points).query(interp)
-        snapped = self.mesh.points[ids]
+        # Snap to mesh: grid first, kd-tree only for samples too far from any vertex
+        ids, ok = grid.query(interp)
+        if not ok.all():
+            _, ids[~ok] = self._get_point_tree().query(interp[~ok], workers=-1)
+        snapped = self._pts_np[ids]
         
-        self.path_cache[key] = snapped
-        return snapped
+        entry = (snapped, snapped.min(0), snapped.max(0))
+        self.path_cache[key] = entry
+        self._path_cache_bytes += snapped.nbytes
+        # Evict least recently used paths, never the one just added
+        while self._path_cache_bytes > PATH_CACHE_BYTES and len(self.path_cache) > 1:
+            _, old = self.path_cache.popitem(last=False)
+            self._path_cache_bytes -= old[0].nbytes
+        return entry
 
     def _get_full_path_points(self):
         if len(self.nodes) < 2: return np.array([])
-        full = []
         count = len(self.nodes)
         rng = count if self.is_closed else count - 1
-        for i in range(rng):
-            pts = self._get_segment_points(i, (i+1)%count)
-            # Avoid duplicating connecting points
-            full.append(pts[1:] if full else pts)
-        return np.concatenate(full) if full else np.array([])
+        segs = [self._get_segment_points(i, (i+1)%count) for i in range(rng)]
+        # Avoid duplicating connecting points
+        sizes = [len(segs[0])] + [len(p) - 1 for p in segs[1:]]
+        
+        if self._full_pts_buf is None or [sl.stop - sl.start for sl in self._seg_slices] != sizes:
+            ends = np.cumsum(sizes)
+            self._seg_slices = [slice(int(e - n), int(e)) for n, e in zip(sizes, ends)]
+            self._seg_src = [None] * rng
+            self._full_pts_buf = np.empty((int(ends[-1]), 3), dtype=segs[0].dtype)
+        
+        # Unchanged segments come back from path_cache as the same array, so only edits get copied
+        for i, (pts, sl) in enumerate(zip(segs, self._seg_slices)):
+            if self._seg_src[i] is not pts:
+                self._full_pts_buf[sl] = pts if i == 0 else pts[1:]
+                self._seg_src[i] = pts
+        return self._full_pts_buf
+
+    def _build_curve_pipeline(self):
+        """polyline -> vtkSplineFilter -> vtkTubeFilter -> actor, built once per tool."""
+        self._curve_src = vtk.vtkPolyData()
+        self._curve_src.SetPoints(vtk.vtkPoints())
+        self._curve_spline, self._curve_tube = _tube_filters(self._curve_src)
+        
+        self._curve_mapper = pv.DataSetMapper()
+        self._curve_mapper.SetInputConnection(self._curve_tube.GetOutputPort())
+        self._curve_mapper.ScalarVisibilityOff()
+        self._curve_actor = pv.Actor(mapper=self._curve_mapper)
+        self._curve_actor.prop.color = self.curve_color
+        self._curve_n = 0
+        self._curve_async = False
+
+    def _show_curve_actor(self):
+        if self.line_actor is None:
+            self.plotter.add_actor(
+                self._curve_actor, pickable=False, 
+                reset_camera=False, name="BezierCurve"
+            )
+            self.line_actor = self._curve_actor
 
     def update_curve(self):
         """Visualizes the path as a smooth spline tube."""
-        if self.line_actor: 
-            self.plotter.remove_actor(self.line_actor)
-            self.line_actor = None
-            
         pts = self._get_full_path_points()
+        self._curve_gen += 1
+        if len(pts) <= 3 or self.line_actor is not self._curve_actor:
+            if self.line_actor: 
+                self.plotter.remove_actor(self.line_actor)
+                self.line_actor = None
+        if len(pts) <= ASYNC_CURVE_POINTS:
+            self._curve_sync_gen = self._curve_gen # Anything still on the worker is now stale
         if len(pts) < 2: return
         
         try:
-            if len(pts) > 3:
-                # Smooth spline visualization
-                spline = pv.Spline(pts, n_points=len(pts))
-                tube = spline.tube(radius=self.node_radius * 0.5)
-                self.line_actor = self.plotter.add_mesh(
-                    tube, color=self.curve_color, pickable=False, 
-                    reset_camera=False, name="BezierCurve"
-                )
+            if len(pts) > ASYNC_CURVE_POINTS:
+                # Long curves: the previous tube stays up until the worker's result lands
+                if self._curve_actor is None: self._build_curve_pipeline()
+                self._submit_curve((pts.copy(), self.node_radius * 0.5, self._curve_gen))
+            elif len(pts) > 3:
+                # Smooth spline visualization, only the points change between updates
+                if self._curve_actor is None: self._build_curve_pipeline()
+                if self._curve_async:
+                    self._curve_mapper.SetInputConnection(self._curve_tube.GetOutputPort())
+                    self._curve_async = False
+                n = len(pts)
+                if n != self._curve_n:
+                    _set_polyline(self._curve_src, pts)
+                    self._curve_spline.SetNumberOfSubdivisions(n - 1)
+                    self._curve_n = n
+                else:
+                    self._curve_src.GetPoints().SetData(numpy_to_vtk(np.ascontiguousarray(pts), deep=True))
+                self._curve_src.Modified()
+                self._curve_tube.SetRadius(self.node_radius * 0.5)
+                self._show_curve_actor()
             else:
                 # Fallback to lines for very short segments
                 self.line_actor = self.plotter.add_lines(
@@ -528,6 +998,44 @@ class BezierMarkerTool:
                 )
         except: pass
 
+    def _submit_curve(self, job):
+        if self._curve_future is not None and not self._curve_future.done():
+            self._curve_next = job # Coalesce: replaces any older waiting job
+            return
+        self._start_curve_job(job)
+
+    def _start_curve_job(self, job):
+        if self._curve_worker is None:
+            self._curve_worker = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        pts, radius, gen = job
+        self._curve_future = self._curve_worker.submit(_build_tube_polydata, pts, radius)
+        self._curve_future_gen = gen
+        self._curve_poll.start()
+
+    def _poll_curve_future(self):
+        """UI-thread side of the worker: installs a finished tube, then starts the newest waiting job."""
+        future = self._curve_future
+        if future is None or not future.done(): return
+        self._curve_future = None
+        
+        try: result = future.result()
+        except Exception as e:
+            print(f"Curve build failed: {e}")
+            result = None
+        
+        if result is not None and self._curve_future_gen > self._curve_sync_gen and self._curve_actor is not None:
+            self._curve_mapper.SetInputData(result)
+            self._curve_async = True
+            self._show_curve_actor()
+            self.plotter.render()
+        
+        if self._curve_next is not None:
+            job, self._curve_next = self._curve_next, None
+            if job[2] > self._curve_sync_gen: 
+                self._start_curve_job(job)
+                return
+        self._curve_poll.stop()
+
     # --- REGION SELECTION LOGIC ---
 
     def get_selected_region(self):
@@ -547,7 +1055,10 @@ class BezierMarkerTool:
             current_mesh = self.target_actor.mapper.dataset
             if isinstance(current_mesh, pv.UnstructuredGrid): 
                 current_mesh = current_mesh.extract_surface()
-            self.mesh = current_mesh
+            if current_mesh is not self.mesh:
+                self.mesh = current_mesh
+                self._bind_mesh_arrays()
+                self._build_point_locator()
         if not self.mesh: return None
 
         # 1. Calculate approximate center and normal of the loop
@@ -555,12 +1066,13 @@ class BezierMarkerTool:
         if len(raw_path_points) < 3: return None
         
         center = np.mean(raw_path_points, axis=0)
-        v1 = raw_path_points[0] - center
-        v2 = raw_path_points[len(raw_path_points)//3] - center
-        normal = np.cross(v1, v2)
-        norm_mag = np.linalg.norm(normal)
+        ax, ay, az = (raw_path_points[0] - center).tolist()
+        bx, by, bz = (raw_path_points[len(raw_path_points)//3] - center).tolist()
+        # Plain-float cross product, 3-vectors don't pay for NumPy dispatch
+        nx = ay*bz - az*by; ny = az*bx - ax*bz; nz = ax*by - ay*bx
+        norm_mag = math.sqrt(nx*nx + ny*ny + nz*nz)
         if norm_mag < 1e-6: normal = np.array([0,0,1])
-        else: normal = normal / norm_mag
+        else: normal = np.array([nx / norm_mag, ny / norm_mag, nz / norm_mag])
         
         # Heuristic: Ensure normal points somewhat 'up' or towards camera? 
         # For dental, usually Z-up, but checking dot with Z=-1 might be safer if flipped.
@@ -569,30 +1081,30 @@ class BezierMarkerTool:
         # 2. Ray trace to find a seed point INSIDE the loop
         ray_start = center + (normal * 200)
         ray_end = center - (normal * 200)
-        try: pts, _ = self.mesh.ray_trace(ray_start, ray_end)
-        except: return None
+        if self._ray is not None and self._ray_mesh is self.mesh:
+            hit = self._trace_seed(ray_start, normal, center)
+        else:
+            try: pts, _ = self.mesh.ray_trace(ray_start, ray_end)
+            except: return None
+            hit = pts[0] if len(pts) > 0 else None
         
-        seed_coords = pts[0] if len(pts) > 0 else center
+        seed_coords = hit if hit is not None else center
 
         # 3. Create a barrier on the mesh vertices corresponding to the path
         try:
-            tree = cKDTree(self.mesh.points)
-            dists, candidates = tree.query(raw_path_points, k=5)
+            dists, candidates = self._get_point_tree().query(raw_path_points, k=5, workers=-1)
         except: return None
         
         if "Normals" not in self.mesh.point_data: 
             self.mesh.compute_normals(inplace=True)
-        mesh_normals = self.mesh.point_data["Normals"]
-        
-        clean_path_ids = []
-        for i, pt_candidates in enumerate(candidates):
-            best_pid = pt_candidates[0]
-            # Heuristic: Pick point with normal somewhat facing our loop normal
-            for pid in pt_candidates:
-                if pid < len(mesh_normals): 
-                    if np.dot(mesh_normals[pid], normal) > -0.2: 
-                        best_pid = pid; break
-            clean_path_ids.append(best_pid)
+        self._normals_np = mesh_normals = np.asarray(self.mesh.point_data["Normals"])
+        
+        # Heuristic: Pick the first candidate whose normal somewhat faces our loop normal
+        in_range = candidates < len(mesh_normals)
+        dots = mesh_normals[np.where(in_range, candidates, 0)] @ normal # (P, k)
+        mask = in_range & (dots > -0.2)
+        picked_col = np.where(mask.any(1), mask.argmax(1), 0)
+        clean_path_ids = candidates[np.arange(len(candidates)), picked_col].tolist()
 
         # 4. Make barrier watertight
         barrier_ids = self._make_barrier_watertight(clean_path_ids)
@@ -611,8 +1123,9 @@ class BezierMarkerTool:
         connected = cut_mesh.connectivity(extraction_mode='all')
         
         # Find which region the seed point belongs to
-        cut_tree = cKDTree(connected.points)
-        _, closest_idx = cut_tree.query(seed_coords)
+        # Single query: a linear scan beats building a tree over the cut mesh
+        cut_pts = np.asarray(connected.points)
+        closest_idx = int(np.argmin(((cut_pts - seed_coords) ** 2).sum(1)))
         region_ids = connected.point_data['RegionId']
         target_region = region_ids[closest_idx]
         
@@ -636,6 +1149,29 @@ class BezierMarkerTool:
         return final_selection
     
 
+    def _trace_seed(self, ray_start, normal, center, length=400.0):
+        """
+        First surface hit of the centre ray (embree), plus four rays jittered
+        sideways so a loop centred over a gap still finds a seed nearby.
+        """
+        helper = np.array([1.0, 0.0, 0.0]) if abs(normal[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+        u = np.cross(normal, helper); u /= np.linalg.norm(u)
+        v = np.cross(normal, u)
+        r = self.node_radius * 2.0
+        origins = ray_start + np.array([np.zeros(3), u, -u, v, -v]) * r
+        directions = np.repeat(-normal[None], len(origins), axis=0)
+        
+        locs, idx_ray, _ = self._ray.intersects_location(origins, directions, multiple_hits=False)
+        if not len(locs): return None
+        # Same reach as the original start -> end segment
+        keep = ((locs - origins[idx_ray]) @ -normal) <= length
+        locs, idx_ray = locs[keep], idx_ray[keep]
+        if not len(locs): return None
+        
+        primary = locs[idx_ray == 0]
+        if len(primary): return primary[0]
+        return locs[np.argmin(((locs - center) ** 2).sum(1))]
+
     # Add this method to BezierMarkerTool
     def clear_all_markup(self):
         """Clears all nodes and lines immediately."""
@@ -650,31 +1186,23 @@ class BezierMarkerTool:
             if pid != ordered_ids[-1]: ordered_ids.append(pid)
             
         final = set(ordered_ids)
-        point_cell_ids = self.mesh.point_cell_ids; GetCell = self.mesh.GetCell
+        adj_off, adj_idx = self._get_adjacency()
+        n_points = len(adj_off) - 1
+        if HAS_NUMBA:
+            # BFS workspace shared by every pair, reset by _bfs_bridge itself
+            parent = np.full(n_points, -1, dtype=np.int32)
+            queue = np.empty(n_points, dtype=np.int32)
+            qdepth = np.empty(n_points, dtype=np.int32)
         
         for i in range(len(ordered_ids) - 1):
-            s, e = ordered_ids[i], ordered_ids[i+1]
-            
-            # If s and e share a cell, they are connected
-            if set(point_cell_ids(s)) & set(point_cell_ids(e)): continue
-            
-            # BFS to find path between s and e
-            q = deque([(s, [])]); vis = {s}; found = None
-            while q:
-                cur, path = q.popleft()
-                if len(path) > 20: continue # Limit search depth
-                
-                for cid in point_cell_ids(cur):
-                    cell = GetCell(cid)
-                    for k in range(cell.GetNumberOfPoints()):
-                        neigh = cell.GetPointId(k)
-                        if neigh == e: found = path; break
-                        if neigh not in vis: 
-                            vis.add(neigh)
-                            q.append((neigh, path+[neigh]))
-                    if found: break
-                if found: break
+            s, e = int(ordered_ids[i]), int(ordered_ids[i+1])
+            if s >= n_points or e >= n_points: continue
             
+            # Empty when s and e already share a cell or no bridge exists within range
+            if HAS_NUMBA:
+                found = _bfs_bridge(adj_off, adj_idx, s, e, BARRIER_MAX_DEPTH, parent, queue, qdepth).tolist()
+            else:
+                found = _bfs_bridge_py(adj_off, adj_idx, s, e, BARRIER_MAX_DEPTH)
             if found: final.update(found)
             
-        return final
\ No newline at end of file
+        return final
@@ -1,7 +1,35 @@
+import hashlib
+import math
+import time
 import numpy as np
 import pyvista as pv
 import vtk
-from scipy.spatial import cKDTree
+from scipy.spatial import KDTree
+from PySide6.QtCore import QTimer
+from vtk.util.numpy_support import numpy_to_vtk
+
+# --- Optional JIT ---
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+    def njit(*args, **kwargs):
+        # Kernels stay importable; callers pick the numpy path instead
+        if args and callable(args[0]): return args[0]
+        return lambda f: f
+
+DRAG_INTERVAL_S = 1.0 / 60.0 # Queued handle moves are applied at most this often
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _apply_falloff(points, indices, old_pos, delta, two_sigma_sq):
+    """Gaussian-weighted delta scattered onto points[indices] in one pass (numba only)."""
+    for i in prange(indices.shape[0]):
+        j = indices[i]
+        dx = points[j, 0] - old_pos[0]; dy = points[j, 1] - old_pos[1]; dz = points[j, 2] - old_pos[2]
+        w = math.exp(-(dx*dx + dy*dy + dz*dz) / two_sigma_sq)
+        points[j, 0] += delta[0] * w; points[j, 1] += delta[1] * w; points[j, 2] += delta[2] * w
 
 # ==========================================
 #   INTERACTOR (Corrected VTK Method Names)
@@ -26,6 +54,8 @@ class BorderInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
 
     def OnLeftButtonUp(self):
         if self.is_dragging:
+            # Apply any moves still waiting for the next tick
+            self.tool.drag_active_handle(force=True)
             self.tool.end_drag()
         
         # Always call super to reset camera state
@@ -33,8 +63,8 @@ class BorderInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
 
     def OnMouseMove(self):
         if self.is_dragging:
-            self.tool.drag_active_handle()
-            self.GetInteractor().Render()
+            if self.tool.drag_active_handle():
+                self.GetInteractor().Render()
         else:
             super().OnMouseMove()
 
@@ -48,10 +78,16 @@ class BorderDeformTool:
         self.actor = actor
         self.mesh = actor.mapper.dataset
         
-        self.tree = cKDTree(self.mesh.points)
-        self.control_points = []
+        self.tree = None
+        self._tree_dirty_displacement = 0.0 # Handle motion since self.tree was built
+        self._mesh_key = None # (n_points, MTime) the tree and _resume_points were taken from
+        self._rebuild_tree()
+        self.control_points_arr = np.empty((0, 3)) # One row per handle
         self.handle_actors = [] 
         self.border_tube_actor = None
+        self._spline_points = None # vtkPoints feeding the persistent preview spline -> tube pipeline
+        self._path_hash = None # Digest of the last explicit_path accepted by start()
+        self._resume_points = None # Handle positions at stop(), reused when start() gets the same path
         
         # FIX: Removed SetPickTolerance (Not supported by PropPicker)
         self.picker = vtk.vtkPropPicker()
@@ -60,6 +96,12 @@ class BorderDeformTool:
         self.active_idx = -1
         self.is_dragging = False
         self.drag_depth = 0.0
+        self._pending_moves = [] # Handle targets queued since the last applied tick
+        self._last_drag_t = 0.0
+        # Applies moves still queued when the cursor stops inside a tick
+        self._flush_timer = QTimer()
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush_pending_moves)
         
         self.radius = 15.0 
         self.sigma = 7.0   
@@ -72,13 +114,28 @@ class BorderDeformTool:
             print("Error: No valid border path provided.")
             return
 
-        ideal_points = self._resample_polyline(explicit_path, 16)
-        dists, ids = self.tree.query(ideal_points)
-        self.control_points = [self.mesh.points[i].copy() for i in ids] 
+        # Mesh edited elsewhere (sculpt, autosmooth, dyntopo) since we let go: tree and handles are stale
+        if self._geometry_key() != self._mesh_key:
+            self._rebuild_tree()
+            self._resume_points = None
+
+        # Same path as last time: resume from where the handles were left instead of resnapping
+        path_hash = hashlib.blake2b(np.ascontiguousarray(explicit_path, dtype=np.float64).tobytes(), digest_size=8).digest()
+        if path_hash == self._path_hash and self._resume_points is not None:
+            self.control_points_arr = self._resume_points
+        else:
+            ideal_points = self._resample_polyline(explicit_path, 16)
+            dists, ids = self.tree.query(ideal_points, workers=-1)
+            self.control_points_arr = np.ascontiguousarray(self.mesh.points[ids], dtype=np.float64)
+            self._path_hash = path_hash
+        self._resume_points = None
 
         self.handle_actors = []
-        for pt in self.control_points:
-            sphere = pv.Sphere(radius=0.8, center=pt)
+        # One sphere tessellation; each handle shares its faces and owns translated points
+        template = pv.Sphere(radius=0.8)
+        for pt in self.control_points_arr:
+            sphere = template.copy(deep=False)
+            sphere.points = template.points + pt
             actor = self.plotter.add_mesh(
                 sphere, color="#e74c3c", 
                 pickable=True, 
@@ -98,6 +155,9 @@ class BorderDeformTool:
         self.plotter.iren.interactor.SetInteractorStyle(self._style)
         
     def stop(self):
+        if self._style is None: return # Not running (tools are kept across toggles)
+        self._flush_timer.stop()
+        self._pending_moves = []
         if self._prev_style:
             self.plotter.iren.interactor.SetInteractorStyle(self._prev_style)
         else:
@@ -107,10 +167,14 @@ class BorderDeformTool:
             self.plotter.remove_actor(actor)
         if self.border_tube_actor:
             self.plotter.remove_actor(self.border_tube_actor)
+            self.border_tube_actor = None
             
         self.handle_actors = []
-        self.control_points = []
+        if len(self.control_points_arr): self._resume_points = self.control_points_arr
+        self._mesh_key = self._geometry_key() # Our own drags are reflected in tree and handles
+        self.control_points_arr = np.empty((0, 3))
         self.is_dragging = False
+        self._style = None
 
     def try_pick_handle(self):
         x, y = self.plotter.iren.get_event_position()
@@ -135,41 +199,94 @@ class BorderDeformTool:
             return True
         return False
 
-    def drag_active_handle(self):
-        if self.active_idx == -1 or not self.active_handle: return
+    def drag_active_handle(self, force=False):
+        if self.active_idx == -1 or not self.active_handle: return False
 
         x, y = self.plotter.iren.get_event_position()
-        new_pos = self._display_to_world(x, y, self.drag_depth)
-        
-        old_pos = self.control_points[self.active_idx]
-        delta = new_pos - old_pos
-        self.control_points[self.active_idx] = new_pos
+        self._pending_moves.append(self._display_to_world(x, y, self.drag_depth))
+
+        # Mouse moves outpace deform + render; queue them and apply a tick's worth at once
+        now = time.perf_counter()
+        if not force and now - self._last_drag_t < DRAG_INTERVAL_S:
+            if not self._flush_timer.isActive():
+                self._flush_timer.start(max(1, int((DRAG_INTERVAL_S - (now - self._last_drag_t)) * 1000)))
+            return False
+        self._flush_timer.stop()
+        self._last_drag_t = now
+        return self._apply_pending_moves()
+
+    def _flush_pending_moves(self):
+        if self.active_idx == -1 or not self._pending_moves: return
+        self._last_drag_t = time.perf_counter()
+        if self._apply_pending_moves(): self.plotter.render()
+
+    def _apply_pending_moves(self):
+        start_pos = self.control_points_arr[self.active_idx].copy()
+        path = np.vstack([start_pos, *self._pending_moves])
+        self._pending_moves = []
+        old_positions, deltas = path[:-1], np.diff(path, axis=0)
+        self.control_points_arr[self.active_idx] = path[-1]
         
         src = self.active_handle.mapper.dataset
-        src.points += delta
-
-        # Apply Deformation
-        indices = self.tree.query_ball_point(old_pos, self.radius)
-        if indices:
-            pts = self.mesh.points[indices]
-            dists = np.linalg.norm(pts - old_pos, axis=1)
-            weights = np.exp(-(dists**2) / (2 * self.sigma**2))
-            
-            self.mesh.points[indices] += delta * weights[:, np.newaxis]
+        src.points += path[-1] - start_pos
+
+        # Apply Deformation (one parallel ball query for every queued step)
+        hits = self.tree.query_ball_point(old_positions, self.radius, workers=-1, return_sorted=False)
+        points = np.asarray(self.mesh.points) # Plain view onto the VTK buffer
+        two_sigma_sq = 2 * self.sigma**2
+        moved = False
+        if HAS_NUMBA:
+            # Indices are unique within a step, so the parallel scatter never collides
+            for old_pos, delta, indices in zip(old_positions, deltas, hits):
+                if not indices: continue
+                _apply_falloff(points, np.asarray(indices, dtype=np.int64), old_pos, delta, two_sigma_sq)
+                moved = True
+        else:
+            all_idx, all_disp = [], []
+            for old_pos, delta, indices in zip(old_positions, deltas, hits):
+                if not indices: continue
+                indices = np.asarray(indices)
+                dists_sq = ((points[indices] - old_pos) ** 2).sum(1)
+                weights = np.exp(-dists_sq / two_sigma_sq)
+                all_idx.append(indices)
+                all_disp.append(delta * weights[:, np.newaxis])
+            if all_idx:
+                # Overlapping neighbourhoods accumulate instead of overwriting
+                np.add.at(points, np.concatenate(all_idx), np.concatenate(all_disp))
+                moved = True
+
+        if moved:
             
             # FIX: Correct PyVista/VTK update call
             self.mesh.modified() 
 
+            # Small moves barely shift the queried neighbourhood; rebuild only once they add up
+            self._tree_dirty_displacement += float(np.linalg.norm(deltas, axis=1).sum())
+            if self._tree_dirty_displacement > self.radius / 4:
+                self._rebuild_tree()
+
         self._update_tube_visual()
+        return True
 
     def end_drag(self):
         self.is_dragging = False
+        self._flush_timer.stop()
+        self._pending_moves = []
         if self.active_handle:
             prop = self.active_handle.GetProperty()
             prop.SetColor(0.905, 0.298, 0.235)
         self.active_handle = None
         self.active_idx = -1
 
+    def _rebuild_tree(self):
+        self.tree = KDTree(self.mesh.points, leafsize=64, balanced_tree=False, compact_nodes=False, copy_data=False)
+        self._tree_dirty_displacement = 0.0
+        self._mesh_key = self._geometry_key()
+
+    def _geometry_key(self):
+        # Dataset MTime covers Modified() calls plus point and point-data arrays
+        return (self.mesh.n_points, self.mesh.GetMTime())
+
     def set_radius(self, radius):
         self.radius = radius
         self.sigma = radius / 2.5
@@ -188,27 +305,47 @@ class BorderDeformTool:
         if coords[3] == 0: return np.array(coords[:3])
         return np.array(coords[:3]) / coords[3]
 
+    def _build_tube_pipeline(self):
+        """vtkPoints -> vtkParametricSpline -> vtkTubeFilter -> actor, built once per tool."""
+        self._spline_points = vtk.vtkPoints()
+        self._spline = vtk.vtkParametricSpline()
+        self._spline.SetPoints(self._spline_points)
+        self._spline_source = vtk.vtkParametricFunctionSource()
+        self._spline_source.SetParametricFunction(self._spline)
+        self._spline_source.SetUResolution(99) # 100 samples, as pv.Spline(n_points=100)
+        tube = vtk.vtkTubeFilter()
+        tube.SetInputConnection(self._spline_source.GetOutputPort())
+        tube.SetRadius(0.2)
+        tube.SetNumberOfSides(20)
+        tube.CappingOn()
+        
+        mapper = pv.DataSetMapper()
+        mapper.SetInputConnection(tube.GetOutputPort())
+        mapper.ScalarVisibilityOff()
+        self._tube_actor = pv.Actor(mapper=mapper)
+        self._tube_actor.prop.color = "#f1c40f"
+
     def _update_tube_visual(self):
-        if self.border_tube_actor: 
-            self.plotter.remove_actor(self.border_tube_actor)
-        if len(self.control_points) > 2:
-            pts = np.vstack([self.control_points, self.control_points[0]])
-            tube = pv.Spline(pts, n_points=100).tube(radius=0.2)
-            self.border_tube_actor = self.plotter.add_mesh(
-                tube, color="#f1c40f", pickable=False, name="BorderPreview"
-            )
+        if len(self.control_points_arr) <= 2:
+            if self.border_tube_actor:
+                self.plotter.remove_actor(self.border_tube_actor)
+                self.border_tube_actor = None
+            return
+
+        # Only the control points change; VTK re-runs spline + tube on the next render
+        if self._spline_points is None: self._build_tube_pipeline()
+        pts = np.concatenate([self.control_points_arr, self.control_points_arr[:1]])
+        self._spline_points.SetData(numpy_to_vtk(pts, deep=True))
+        self._spline.Modified()
+        if self.border_tube_actor is None:
+            self.plotter.add_actor(self._tube_actor, pickable=False, reset_camera=False, name="BorderPreview")
+            self.border_tube_actor = self._tube_actor
 
     def _resample_polyline(self, points, n_samples):
         if len(points) < 2: return np.array(points)
         dists = np.linalg.norm(np.diff(points, axis=0), axis=1)
         cum_dist = np.insert(np.cumsum(dists), 0, 0)
         targets = np.linspace(0, cum_dist[-1], n_samples + 1)[:-1]
-        resampled = []
-        for t in targets:
-            idx = np.searchsorted(cum_dist, t) - 1
-            idx = max(0, min(idx, len(cum_dist)-2))
-            t0, t1 = cum_dist[idx], cum_dist[idx+1]
-            ratio = (t - t0) / (t1 - t0) if (t1-t0) > 1e-9 else 0
-            pt = points[idx] * (1-ratio) + points[idx+1] * ratio
-            resampled.append(pt)
-        return np.array(resampled)
\ No newline at end of file
+        points = np.asarray(points, dtype=float)
+        # One interp per axis instead of a searchsorted per sample
+        return np.stack([np.interp(targets, cum_dist, points[:, k]) for k in range(points.shape[1])], axis=1)
\ No newline at end of file
@@ -1,3 +1,4 @@
+import math
 import vtk
 import numpy as np
 import pyvista as pv
@@ -11,6 +12,33 @@ except ImportError:
     HAS_SCULPT_CORE = False
     print(" WARNING: sculpt_tore C++ module not found. Performance will be degraded.")
 
+# id(mesh) -> (n_points, polys MTime) as SculptTool last left it (clean, normals done); a match means nothing new to weld.
+# Holds at most the most recently sculpted mesh.
+_CLEAN_STAMPS = {}
+
+def _clean_stamp(mesh):
+    return (mesh.n_points, mesh.GetPolys().GetMTime())
+
+def _vertex_face_csr(tris, n_points):
+    """
+    CSR vertex -> incident triangles (vf_off, vf_idx):
+    faces around p are vf_idx[vf_off[p]:vf_off[p+1]].
+    """
+    corners = tris.ravel()
+    vf_idx = (np.argsort(corners, kind="stable") // 3).astype(np.int64)
+    vf_off = np.zeros(n_points + 1, dtype=np.int64)
+    np.cumsum(np.bincount(corners, minlength=n_points), out=vf_off[1:])
+    return vf_off, vf_idx
+
+def _faces_around(vf_off, vf_idx, verts):
+    """Unique triangles incident to any of verts."""
+    starts = vf_off[verts]; counts = vf_off[verts + 1] - starts
+    total = counts.sum()
+    if total == 0: return np.zeros(0, dtype=np.int64)
+    # Concatenated ranges starts[i] .. starts[i] + counts[i]
+    run_start = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return np.unique(vf_idx[run_start + np.arange(total)])
+
 class SculptInteractor(vtk.vtkInteractorStyleTrackballCamera):
     """
     Robust interactor that prioritizes:
@@ -23,6 +51,9 @@ class SculptInteractor(vtk.vtkInteractorStyleTrackballCamera):
         self.tool = tool
         self._interaction_state = "NONE" # NONE, SCULPTING, ROTATING, PANNING
         self._is_hovering_mesh = False 
+        self._last_stamp_xy = None # Screen position of the last applied stamp
+        self._stamp_min_px = 2.0   # Closer mouse moves are skipped
+        self._stamp_pending = False # A skipped move is still owed a stamp on release
 
         # Observers
         self.AddObserver("LeftButtonPressEvent", self.OnLeftDown)
@@ -49,8 +80,7 @@ class SculptInteractor(vtk.vtkInteractorStyleTrackballCamera):
         click_pos = iren.GetEventPosition()
         
         # 1. CHECK WHAT WE CLICKED
-        picker = vtk.vtkCellPicker()
-        picker.SetTolerance(0.005)
+        picker = self.tool._picker
         picker.Pick(click_pos[0], click_pos[1], 0, self.tool.plotter.renderer)
         picked_actor = picker.GetActor()
         
@@ -67,6 +97,7 @@ class SculptInteractor(vtk.vtkInteractorStyleTrackballCamera):
             pos = np.array(picker.GetPickPosition())
             normal = np.array(picker.GetPickNormal())
             self.tool.apply_brush_step(pos, normal)
+            self._mark_stamp(click_pos, pos)
             
         else:
             self._interaction_state = "ROTATING"
@@ -74,8 +105,12 @@ class SculptInteractor(vtk.vtkInteractorStyleTrackballCamera):
             
     def OnLeftUp(self, obj, event):
         if self._interaction_state == "SCULPTING":
+            # Land the stroke where the mouse was released
+            if self._stamp_pending: self.ApplyBrush(obj, force=True)
             self.tool.end_stroke()
             self._interaction_state = "NONE"
+            self._last_stamp_xy = None
+            self._stamp_pending = False
             
         elif self._interaction_state == "ROTATING":
             self.EndRotate()
@@ -103,8 +138,7 @@ class SculptInteractor(vtk.vtkInteractorStyleTrackballCamera):
         iren = obj.GetInteractor()
         x, y = iren.GetEventPosition()
         
-        picker = vtk.vtkCellPicker()
-        picker.SetTolerance(0.005)
+        picker = self.tool._picker
         picker.Pick(x, y, 0, self.tool.plotter.renderer)
         picked = picker.GetActor()
         
@@ -120,12 +154,18 @@ class SculptInteractor(vtk.vtkInteractorStyleTrackballCamera):
         else:
             self.tool.hide_cursor()
 
-    def ApplyBrush(self, obj):
+    def ApplyBrush(self, obj, force=False):
         iren = obj.GetInteractor()
         x, y = iren.GetEventPosition()
         
-        picker = vtk.vtkCellPicker()
-        picker.SetTolerance(0.005)
+        # Sub-step moves would re-run sculpt + normals + render for almost nothing
+        if not force and self._last_stamp_xy is not None:
+            dx = x - self._last_stamp_xy[0]; dy = y - self._last_stamp_xy[1]
+            if dx*dx + dy*dy < self._stamp_min_px**2:
+                self._stamp_pending = True
+                return
+        
+        picker = self.tool._picker
         picker.Pick(x, y, 0, self.tool.plotter.renderer)
         
         # We can sculpt even if the mouse slips off the mesh slightly, 
@@ -134,6 +174,12 @@ class SculptInteractor(vtk.vtkInteractorStyleTrackballCamera):
             pos = np.array(picker.GetPickPosition())
             normal = np.array(picker.GetPickNormal())
             self.tool.apply_brush_step(pos, normal)
+            self._mark_stamp((x, y), pos)
+
+    def _mark_stamp(self, xy, pos):
+        self._last_stamp_xy = xy
+        self._stamp_pending = False
+        self._stamp_min_px = max(2.0, self.tool.radius_in_pixels(pos) / 4)
 
 
 class SculptTool:
@@ -163,6 +209,10 @@ class SculptTool:
         self.detail_size = 0.5 
         
         # Internals
+        self._tris = None # (n, 3) mesh triangles, for local normal updates
+        self._vf_off = None; self._vf_idx = None
+        self._vtk_faces_buf = None # Padded VTK face rows, grown on demand
+        self._picker = None # Shared by every interactor event while active
         self.cursor_actor = None
         self._style = None
         self._prev_style = None
@@ -204,7 +254,9 @@ class SculptTool:
             self.mesh.triangulate(inplace=True)
         
         # Clean to merge duplicate points (important for topology)
-        self.mesh.clean(inplace=True)
+        # Skipped when neither the point count nor the polys changed since this tool last let go of the mesh
+        if _CLEAN_STAMPS.get(id(self.mesh)) != _clean_stamp(self.mesh):
+            self.mesh.clean(inplace=True)
 
 
         if self.mesh.points.dtype != np.float64:
@@ -227,14 +279,27 @@ class SculptTool:
             except Exception as e:
                 print(f"Error loading mesh into C++ engine: {e}")
 
+        self._set_topology(self.mesh.faces.reshape(-1, 4)[:, 1:])
+        self._vtk_faces_buf = None
+        self._faces_buffer(self.mesh.n_faces)
+
         self._create_cursor()
         
+        # One picker for the whole session, restricted to the sculpted actor
+        self._picker = vtk.vtkCellPicker()
+        self._picker.SetTolerance(0.005)
+        self._picker.AddPickList(self.app.active_actor)
+        self._picker.PickFromListOn()
+        
         self._prev_style = self.plotter.iren.interactor.GetInteractorStyle()
         self._style = SculptInteractor(self)
         self.plotter.iren.interactor.SetInteractorStyle(self._style)
         
         self.plotter.disable_picking()
         
+        # compute_normals installed a new polys array, so stamp only now
+        _CLEAN_STAMPS[id(self.mesh)] = _clean_stamp(self.mesh)
+        
         if self.mesh.n_points > 0:
             center = self.mesh.center
             self.update_cursor_visual(center)
@@ -251,7 +316,15 @@ class SculptTool:
             self.plotter.remove_actor(self.cursor_actor)
             self.cursor_actor = None
             
+        # Brush edits leave the mesh clean but rewrite the polys: re-stamp it and forget any other mesh
+        if self.mesh is not None:
+            stamp = _clean_stamp(self.mesh)
+            _CLEAN_STAMPS.clear()
+            _CLEAN_STAMPS[id(self.mesh)] = stamp
         self.mesh = None
+        self._tris = None; self._vf_off = None; self._vf_idx = None
+        self._vtk_faces_buf = None
+        self._picker = None
         
         # Clear engine memory
         if self.engine:
@@ -277,9 +350,10 @@ class SculptTool:
         eff_detail = self.detail_size if self.dyntopo_enabled else 999999.0
 
 
+        # Contiguous float64 arrays go straight through the binding, no list round trip
         new_verts, new_faces_flat = self.engine.sculpt(
-            center.tolist(), 
-            normal.tolist(), 
+            np.ascontiguousarray(center, dtype=np.float64), 
+            np.ascontiguousarray(normal, dtype=np.float64), 
             self.radius,
             self.strength,
             self.mode,
@@ -287,26 +361,29 @@ class SculptTool:
         )
         
 
+        old_pts = self.mesh.points
         self.mesh.points = new_verts
         
- 
-        if len(new_faces_flat) > 0:
+        topology_changed = len(new_faces_flat) > 0
+        if topology_changed:
             n_faces = len(new_faces_flat) // 3
             
-
-            padding = np.full((n_faces, 1), 3, dtype=np.int32)
-
-            faces_reshaped = new_faces_flat.reshape(-1, 3)
-
-            vtk_faces = np.hstack((padding, faces_reshaped)).flatten()
+            # Padded [3, a, b, c] rows written into a reused buffer; the '3' column never changes
+            buf = self._faces_buffer(n_faces)
+            buf[:, 1:] = new_faces_flat.reshape(-1, 3)
             
-            self.mesh.faces = vtk_faces
+            self.mesh.faces = buf.ravel()
             
  
             self.engine.set_mesh(new_verts, new_faces_flat)
 
-
-        self.mesh.compute_normals(point_normals=True, cell_normals=False, inplace=True)
+        if topology_changed or len(new_verts) != len(old_pts) or "Normals" not in self.mesh.point_data:
+            self.mesh.compute_normals(point_normals=True, cell_normals=False, inplace=True)
+            # Taken after compute_normals, which may flip faces for consistency
+            self._set_topology(self.mesh.faces.reshape(-1, 4)[:, 1:])
+        else:
+            # Only the brush footprint moved; refresh normals around it
+            self._update_local_normals(np.flatnonzero((new_verts != old_pts).any(axis=1)))
         
         self.mesh.GetPoints().Modified()
         self.mesh.Modified()
@@ -315,6 +392,57 @@ class SculptTool:
     def end_stroke(self):
         pass
 
+    def _faces_buffer(self, n_faces):
+        """First n_faces rows of the padded face buffer, reallocating with headroom when it is too small."""
+        if self._vtk_faces_buf is None or len(self._vtk_faces_buf) < n_faces:
+            cap = max(n_faces + n_faces // 2, 1024) # Dyntopo keeps adding faces during a stroke
+            self._vtk_faces_buf = np.empty((cap, 4), dtype=np.int32)
+            self._vtk_faces_buf[:, 0] = 3
+        return self._vtk_faces_buf[:n_faces]
+
+    def _set_topology(self, tris):
+        self._tris = np.asarray(tris, dtype=np.int64).reshape(-1, 3)
+        self._vf_off, self._vf_idx = _vertex_face_csr(self._tris, self.mesh.n_points)
+
+    def _update_local_normals(self, moved):
+        """Recompute point normals for vertices whose 1-ring touches a moved vertex."""
+        if len(moved) == 0 or self._tris is None: return
+        tris = self._tris
+        dirty = np.unique(tris[_faces_around(self._vf_off, self._vf_idx, moved)])
+        ring = _faces_around(self._vf_off, self._vf_idx, dirty)
+
+        # Unit face normals averaged per point, same weighting as vtkPolyDataNormals
+        pts = self.mesh.points
+        corners = tris[ring]
+        fn = np.cross(pts[corners[:, 1]] - pts[corners[:, 0]], pts[corners[:, 2]] - pts[corners[:, 0]])
+        fn_len = np.linalg.norm(fn, axis=1, keepdims=True)
+        fn /= np.where(fn_len > 0, fn_len, 1.0)
+
+        local = np.full(self.mesh.n_points, -1, dtype=np.int64)
+        local[dirty] = np.arange(len(dirty))
+        slots = local[corners].ravel()
+        keep = slots >= 0
+        acc = np.zeros((len(dirty), 3))
+        np.add.at(acc, slots[keep], np.repeat(fn, 3, axis=0)[keep])
+        acc_len = np.linalg.norm(acc, axis=1, keepdims=True)
+        acc /= np.where(acc_len > 0, acc_len, 1.0)
+
+        normals = self.mesh.point_data["Normals"]
+        normals[dirty] = acc
+        self.mesh.GetPointData().GetArray("Normals").Modified()
+
+    def radius_in_pixels(self, pos):
+        """Brush radius as seen on screen at pos."""
+        renderer = self.plotter.renderer
+        cam = renderer.GetActiveCamera()
+        if cam.GetParallelProjection():
+            view_h = 2.0 * cam.GetParallelScale()
+        else:
+            dist = np.linalg.norm(np.asarray(pos) - np.array(cam.GetPosition()))
+            view_h = 2.0 * dist * math.tan(math.radians(cam.GetViewAngle()) / 2)
+        if view_h <= 0: return 0.0
+        return self.radius * renderer.GetSize()[1] / view_h
+
     def _create_cursor(self):
         if self.cursor_actor: return
         geo = pv.Sphere(radius=1.0, theta_resolution=30, phi_resolution=30)
@@ -4,6 +4,129 @@ import pyvista as pv
 import math
 from matplotlib.colors import LinearSegmentedColormap
 
+# --- Optional JIT ---
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+    def njit(*args, **kwargs):
+        # Kernels stay importable; callers fall back to the VTK locator loop
+        if args and callable(args[0]): return args[0]
+        return lambda f: f
+
+# --- Optional embree ray tracing (trimesh + embreex/pyembree) ---
+try:
+    import trimesh
+    HAS_EMBREE = trimesh.ray.has_embree
+except ImportError:
+    HAS_EMBREE = False
+
+BVH_LEAF_SIZE = 8
+
+@njit(cache=True)
+def _bvh_build(tri_min, tri_max, centroids, leaf_size):
+    """Median-split BVH over triangle boxes. A node's right child is its left child + 1, leaves have left == -1."""
+    n = centroids.shape[0]
+    order = np.arange(n)
+    max_nodes = max(2 * n, 1)
+    node_min = np.empty((max_nodes, 3)); node_max = np.empty((max_nodes, 3))
+    node_left = np.full(max_nodes, -1, dtype=np.int64)
+    node_start = np.zeros(max_nodes, dtype=np.int64); node_count = np.zeros(max_nodes, dtype=np.int64)
+    stack = np.empty(max_nodes, dtype=np.int64)
+    node_count[0] = n
+    n_nodes = 1
+    stack[0] = 0; sp = 1
+    while sp > 0:
+        sp -= 1
+        k = stack[sp]
+        s = node_start[k]; c = node_count[k]
+        bmin = np.full(3, np.inf); bmax = np.full(3, -np.inf)
+        cmin = np.full(3, np.inf); cmax = np.full(3, -np.inf)
+        for j in range(s, s + c):
+            f = order[j]
+            for a in range(3):
+                bmin[a] = min(bmin[a], tri_min[f, a]); bmax[a] = max(bmax[a], tri_max[f, a])
+                cmin[a] = min(cmin[a], centroids[f, a]); cmax[a] = max(cmax[a], centroids[f, a])
+        node_min[k] = bmin; node_max[k] = bmax
+        if c <= leaf_size: continue
+
+        axis = np.argmax(cmax - cmin)
+        if cmax[axis] - cmin[axis] <= 0.0: continue # Coincident centroids, keep as leaf
+        keys = np.empty(c)
+        for j in range(c): keys[j] = centroids[order[s + j], axis]
+        order[s:s + c] = order[s:s + c][np.argsort(keys)]
+
+        half = c // 2
+        left = n_nodes; n_nodes += 2
+        node_left[k] = left
+        node_start[left] = s; node_count[left] = half
+        node_start[left + 1] = s + half; node_count[left + 1] = c - half
+        stack[sp] = left; stack[sp + 1] = left + 1; sp += 2
+    return order, node_min[:n_nodes].copy(), node_max[:n_nodes].copy(), node_left[:n_nodes].copy(), node_start[:n_nodes].copy(), node_count[:n_nodes].copy()
+
+@njit(cache=True, parallel=True)
+def _bvh_first_hits(v0, e1, e2, order, node_min, node_max, node_left, node_start, node_count,
+                    origins, direction, t_max, hit_pts, hit_mask):
+    """Nearest hit within t_max along one shared direction, one ray per origin (numba only)."""
+    dx = direction[0]; dy = direction[1]; dz = direction[2]
+    ix = 1.0 / dx if dx != 0.0 else 1e30
+    iy = 1.0 / dy if dy != 0.0 else 1e30
+    iz = 1.0 / dz if dz != 0.0 else 1e30
+    for i in prange(origins.shape[0]):
+        ox = origins[i, 0]; oy = origins[i, 1]; oz = origins[i, 2]
+        best = t_max; found = False
+        stack = np.empty(64, dtype=np.int64)
+        stack[0] = 0; sp = 1
+        while sp > 0:
+            sp -= 1
+            k = stack[sp]
+            # Slab test against the node box
+            t1 = (node_min[k, 0] - ox) * ix; t2 = (node_max[k, 0] - ox) * ix
+            t_near = min(t1, t2); t_far = max(t1, t2)
+            t1 = (node_min[k, 1] - oy) * iy; t2 = (node_max[k, 1] - oy) * iy
+            t_near = max(t_near, min(t1, t2)); t_far = min(t_far, max(t1, t2))
+            t1 = (node_min[k, 2] - oz) * iz; t2 = (node_max[k, 2] - oz) * iz
+            t_near = max(t_near, min(t1, t2)); t_far = min(t_far, max(t1, t2))
+            if t_far < max(t_near, 0.0) or t_near > best: continue
+
+            if node_left[k] >= 0:
+                stack[sp] = node_left[k]; stack[sp + 1] = node_left[k] + 1; sp += 2
+                continue
+
+            # Leaf: Moller-Trumbore against each triangle
+            for j in range(node_start[k], node_start[k] + node_count[k]):
+                f = order[j]
+                px = dy*e2[f, 2] - dz*e2[f, 1]; py = dz*e2[f, 0] - dx*e2[f, 2]; pz = dx*e2[f, 1] - dy*e2[f, 0]
+                det = e1[f, 0]*px + e1[f, 1]*py + e1[f, 2]*pz
+                if abs(det) < 1e-12: continue
+                inv_det = 1.0 / det
+                tx = ox - v0[f, 0]; ty = oy - v0[f, 1]; tz = oz - v0[f, 2]
+                u = (tx*px + ty*py + tz*pz) * inv_det
+                if u < 0.0 or u > 1.0: continue
+                qx = ty*e1[f, 2] - tz*e1[f, 1]; qy = tz*e1[f, 0] - tx*e1[f, 2]; qz = tx*e1[f, 1] - ty*e1[f, 0]
+                v = (dx*qx + dy*qy + dz*qz) * inv_det
+                if v < 0.0 or u + v > 1.0: continue
+                t = (e2[f, 0]*qx + e2[f, 1]*qy + e2[f, 2]*qz) * inv_det
+                if t >= 0.0 and t < best:
+                    best = t; found = True
+        if found:
+            hit_pts[i, 0] = ox + best*dx; hit_pts[i, 1] = oy + best*dy; hit_pts[i, 2] = oz + best*dz
+            hit_mask[i] = True
+
+def _build_bvh(mesh):
+    """Triangle arrays + BVH for _bvh_first_hits, or None when the mesh has no faces."""
+    tri_mesh = mesh if mesh.is_all_triangles else mesh.triangulate()
+    if tri_mesh.n_cells == 0: return None
+    faces = tri_mesh.faces.reshape(-1, 4)[:, 1:]
+    tris = np.asarray(tri_mesh.points, dtype=np.float64)[faces]
+    v0 = np.ascontiguousarray(tris[:, 0])
+    e1 = np.ascontiguousarray(tris[:, 1] - tris[:, 0])
+    e2 = np.ascontiguousarray(tris[:, 2] - tris[:, 0])
+    tree = _bvh_build(tris.min(axis=1), tris.max(axis=1), tris.mean(axis=1), BVH_LEAF_SIZE)
+    return (v0, e1, e2) + tuple(tree)
+
 class SurveyorInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
     def __init__(self, parent):
         self.parent = parent
@@ -62,6 +185,11 @@ class UndercutSurveyor:
         self.original_scalars = self.original_mesh.active_scalars_name
         self.original_color = self.actor.prop.color
         self._style = None
+        self._ray = None # embree intersector over analysis_mesh, preferred when available
+        self._bvh = None # Compiled ray-cast structure over analysis_mesh (numba only)
+        self.locator = None # Cell locator for the plain VTK fallback
+        self.normals = None
+        self._R_inv = np.eye(3) # World -> object rotation for the insertion vector
 
     def start(self):
         if isinstance(self.original_mesh, pv.UnstructuredGrid):
@@ -74,6 +202,29 @@ class UndercutSurveyor:
             self.analysis_mesh.compute_normals(inplace=True)
         except: pass
         
+        # Geometry is fixed while surveying; only the direction changes
+        self._ray = None; self._bvh = None
+        if HAS_EMBREE:
+            try:
+                tri_mesh = self.analysis_mesh if self.analysis_mesh.is_all_triangles else self.analysis_mesh.triangulate()
+                self._ray = trimesh.Trimesh(tri_mesh.points, tri_mesh.regular_faces, process=False).ray
+            except Exception as e:
+                print(f"Embree ray casting unavailable, using fallback: {e}")
+        if self._ray is None and HAS_NUMBA:
+            self._bvh = _build_bvh(self.analysis_mesh)
+        self.locator = None
+        if self._ray is None and self._bvh is None:
+            self.locator = vtk.vtkStaticCellLocator()
+            self.locator.SetDataSet(self.analysis_mesh)
+            self.locator.BuildLocator()
+        self.normals = np.ascontiguousarray(self.analysis_mesh.point_data["Normals"], dtype=np.float64)
+        
+        # Directions ignore translation; only the upper-left 3x3 of the actor matrix matters
+        mat = self.actor.GetMatrix()
+        R = np.array([[mat.GetElement(i, j) for j in range(3)] for i in range(3)], dtype=np.float64)
+        try: self._R_inv = np.linalg.inv(R)
+        except np.linalg.LinAlgError: self._R_inv = np.eye(3)
+        
         self.actor.mapper.SetInputData(self.analysis_mesh)
         self.actor.SetTexture(None)
         self.analysis_mesh.set_active_scalars(None)
@@ -108,6 +259,8 @@ class UndercutSurveyor:
             self.actor.prop.color = self.original_color
             
         self.analysis_mesh = None 
+        self._ray = None; self._bvh = None
+        self.locator = None; self.normals = None
         self.plotter.enable_trackball_style()
         self.plotter.render()
 
@@ -159,49 +312,55 @@ class UndercutSurveyor:
         if self.analysis_mesh is None: return
         mesh = self.analysis_mesh 
         
-        world_ins = self.current_vector
-        if self.actor.GetMatrix():
-            mat = self.actor.GetMatrix()
-            vtk_mat = vtk.vtkMatrix4x4()
-            vtk_mat.DeepCopy(mat)
-            vtk_mat.Invert()
-            vec_homo = [*world_ins, 0.0]
-            obj_vec = [0.0]*4
-            vtk_mat.MultiplyPoint(vec_homo, obj_vec)
-            obj_ins_vec = np.array(obj_vec[:3])
-            norm = np.linalg.norm(obj_ins_vec)
-            if norm > 0: obj_ins_vec /= norm
-        else:
-            obj_ins_vec = world_ins
+        obj_ins_vec = self._R_inv @ self.current_vector
+        norm = np.linalg.norm(obj_ins_vec)
+        if norm > 0: obj_ins_vec /= norm
             
         removal_vec = -obj_ins_vec
         
-        normals = mesh.point_data["Normals"]
-        dots = np.dot(normals, removal_vec)
-        candidate_indices = np.where(dots < -0.05)[0]
-        
-        locator = vtk.vtkStaticCellLocator()
-        locator.SetDataSet(mesh)
-        locator.BuildLocator()
+        candidate_indices = np.flatnonzero(self.normals @ removal_vec < -0.05)
         
         undercut_depths = np.zeros(mesh.n_points)
         ray_len = mesh.length * 2.0
         points = mesh.points
         
-        ray_start = [0.0]*3; ray_end = [0.0]*3
-        t = vtk.mutable(0.0)
-        x = [0.0]*3; pcoords = [0.0]*3
-        subId = vtk.mutable(0); cellId = vtk.mutable(0)
+        cand_pts = np.asarray(points[candidate_indices], dtype=np.float64)
+        hit_pts = np.empty_like(cand_pts)
+        hit_mask = np.zeros(len(cand_pts), dtype=bool)
         
-        for idx in candidate_indices:
-            pt = points[idx]
-            for k in range(3):
-                ray_start[k] = pt[k] + removal_vec[k] * 0.05
-                ray_end[k] = pt[k] + removal_vec[k] * ray_len
+        if self._ray is not None:
+            # One batched SIMD query for all candidates; embree rays are unbounded, so clip to ray_len
+            origins = cand_pts + removal_vec * 0.05
+            if len(origins):
+                directions = np.broadcast_to(removal_vec, origins.shape)
+                locs, index_ray, _ = self._ray.intersects_location(origins, directions, multiple_hits=False)
+                keep = (locs - origins[index_ray]) @ removal_vec <= ray_len - 0.05
+                hit_pts[index_ray[keep]] = locs[keep]
+                hit_mask[index_ray[keep]] = True
+        elif self._bvh is not None:
+            # Every ray traced in compiled code, in parallel, no VTK call per point
+            removal_vec = np.ascontiguousarray(removal_vec, dtype=np.float64)
+            _bvh_first_hits(*self._bvh, cand_pts + removal_vec * 0.05, removal_vec, ray_len - 0.05, hit_pts, hit_mask)
+        else:
+            locator = self.locator
+            # All ray endpoints in one shot; the loop below only talks to the locator
+            ray_starts = (cand_pts + removal_vec * 0.05).tolist()
+            ray_ends = (cand_pts + removal_vec * ray_len).tolist()
             
-            if locator.IntersectWithLine(ray_start, ray_end, 0.001, t, x, pcoords, subId, cellId):
-                dist = math.sqrt((x[0] - pt[0])**2 + (x[1] - pt[1])**2 + (x[2] - pt[2])**2)
-                undercut_depths[idx] = dist
+            t = vtk.mutable(0.0)
+            x = [0.0]*3; pcoords = [0.0]*3
+            subId = vtk.mutable(0); cellId = vtk.mutable(0)
+            
+            for i in range(len(ray_starts)):
+                if locator.IntersectWithLine(ray_starts[i], ray_ends[i], 0.001, t, x, pcoords, subId, cellId):
+                    hit_pts[i] = x
+                    hit_mask[i] = True
+        
+        # Squared depth as |x|^2 + |p|^2 - 2 x.p, single sqrt over the whole array
+        hx, hp = hit_pts[hit_mask], cand_pts[hit_mask]
+        depth_sq = np.einsum('ij,ij->i', hx, hx) + np.einsum('ij,ij->i', hp, hp) - 2.0 * np.einsum('ij,ij->i', hx, hp)
+        undercut_depths[candidate_indices[hit_mask]] = np.maximum(depth_sq, 0.0)
+        np.sqrt(undercut_depths, out=undercut_depths)
         
         max_depth = np.max(undercut_depths)
         if max_depth == 0: max_depth = 0.1 
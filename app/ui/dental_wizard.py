@@ -2,6 +2,7 @@ import sys
 import time
 import numpy as np
 import pyvista as pv
+import vtk
 import os
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton, QLabel,
@@ -9,20 +10,92 @@ from PySide6.QtWidgets import (
     QDoubleSpinBox, QFormLayout, QGroupBox,
     QListWidget, QApplication, QSlider, QButtonGroup, QRadioButton, QCheckBox, QFrame
 )
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, Signal
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
 # Assuming your main file is named 'main.py' or similar structure
-from core.commands import AddMeshCommand, MultiCommand, DeleteMeshCommand
+from core.commands import AddMeshCommand, MultiCommand, DeleteMeshCommand, TransformCommand
 
 # Import logic from your existing utils file
 from utils.generator import ModelGenerator
+from utils.alignment import align_kernel, fit_plane, rotation_to_z
 from tools.surveyor import UndercutSurveyor
 from tools.bezier import BezierMarkerTool
 from tools.sculptor import SculptTool
+from tools.border_tool import BorderDeformTool
+
+class _BaseGenSignals(QObject):
+    finished = Signal(object) # (base_mesh, border_path) or None
+
+class BaseGenWorker(QRunnable):
+    """Runs ModelGenerator.create_base_from_selection on the thread pool; result arrives via signals.finished."""
+    def __init__(self, patch, base_height, skirt_size):
+        super().__init__()
+        self.signals = _BaseGenSignals()
+        self.patch = patch
+        self.base_height = base_height
+        self.skirt_size = skirt_size
+
+    def run(self):
+        try:
+            result = ModelGenerator.create_base_from_selection(
+                self.patch, base_height=self.base_height, skirt_size=self.skirt_size
+            )
+        except Exception as e:
+            print(f"Base generation failed: {e}")
+            result = None
+        # Queued back to the UI thread, where the receiving widget lives
+        self.signals.finished.emit(result)
+
+def _link_slider_spin(slider, spin, scale=1.0):
+    """Keep slider (spin value * scale) and spin box in step; the mirrored setValue doesn't echo back."""
+    def to_spin(v):
+        spin.blockSignals(True); spin.setValue(v / scale); spin.blockSignals(False)
+    def to_slider(v):
+        slider.blockSignals(True); slider.setValue(int(v * scale)); slider.blockSignals(False)
+    slider.valueChanged.connect(to_spin)
+    spin.valueChanged.connect(to_slider)
+
+def _snapshot_mesh(mesh):
+    """Arrays needed to rebuild mesh for undo: geometry plus point/cell data (vertex colours, UVs, labels)."""
+    pd = mesh.GetPointData()
+    active = {'scalars': pd.GetScalars(), 'tcoords': pd.GetTCoords(), 'normals': pd.GetNormals()}
+    return {
+        'points': np.array(mesh.points),
+        'faces': np.array(mesh.faces),
+        'point_data': {k: np.array(v) for k, v in mesh.point_data.items()},
+        'cell_data': {k: np.array(v) for k, v in mesh.cell_data.items()},
+        'active': {k: a.GetName() for k, a in active.items() if a is not None and a.GetName()},
+    }
+
+def _restore_mesh(snap):
+    mesh = pv.PolyData(snap['points'], snap['faces'])
+    for k, v in snap['point_data'].items(): mesh.point_data[k] = v
+    for k, v in snap['cell_data'].items(): mesh.cell_data[k] = v
+    # Assigning arrays can promote one to active scalars; put the attribute roles back as they were
+    pd = mesh.GetPointData()
+    active = snap['active']
+    pd.SetActiveScalars(active.get('scalars'))
+    if 'tcoords' in active: pd.SetActiveTCoords(active['tcoords'])
+    if 'normals' in active: pd.SetActiveNormals(active['normals'])
+    return mesh
+
+def _replace_mesh(actor, new_mesh):
+    """Show new_mesh on actor; with unchanged topology only the point buffer is overwritten."""
+    mesh = actor.mapper.dataset
+    if (new_mesh.n_points == mesh.n_points and new_mesh.n_cells == mesh.n_cells
+            and np.array_equal(new_mesh.faces, mesh.faces)):
+        # Mapper keeps its cell arrays; only points (and normals, if supplied) go stale
+        mesh.points[:] = new_mesh.points
+        if new_mesh.point_data.get("Normals") is not None:
+            mesh.point_data["Normals"] = new_mesh.point_data["Normals"]
+        mesh.Modified()
+        return
+    actor.mapper.SetInputData(new_mesh)
+    actor.mapper.Update()
 
 # ==========================================
 #       STEP 1: ALIGNMENT WIDGET
@@ -31,8 +104,12 @@ class AlignmentStep(QWidget):
     def __init__(self, app_interface):
         super().__init__()
         self.app = app_interface
-        self.align_points = []
-        self.align_markers = []
+        self.align_points = np.empty((3, 3), dtype=np.float64)
+        self._n_picked = 0
+        self._marker_points = None # Picked points feeding the single glyph marker actor
+        self._marker_actor = None
+        self._markers_shown = False
+        self.region_tool = None # Bezier loop marking the region for the plane fit
         
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(5, 5, 5, 5)
@@ -57,6 +134,17 @@ class AlignmentStep(QWidget):
         self.btn_reset = QPushButton("Reset Points")
         self.btn_reset.clicked.connect(self.reset_points)
         self.layout.addWidget(self.btn_reset)
+
+        # Region fit: least-squares plane over every vertex inside a marked loop
+        self.layout.addSpacing(10)
+        self.btn_region = QPushButton("Mark Fit Region (Bezier)")
+        self.btn_region.setCheckable(True)
+        self.btn_region.clicked.connect(self.toggle_region_tool)
+        self.layout.addWidget(self.btn_region)
+
+        self.btn_align_region = QPushButton("Align via Region Fit")
+        self.btn_align_region.clicked.connect(self.run_region_alignment)
+        self.layout.addWidget(self.btn_align_region)
         self.layout.addStretch()
 
     def toggle_picking(self, checked):
@@ -76,15 +164,20 @@ class AlignmentStep(QWidget):
             self.lbl_status.setText("Picking paused.")
 
     def _on_pick(self, mesh, idx):
-        if mesh is None: return
-        point = mesh.points[idx]
-        self.align_points.append(point)
-        
-        sphere = pv.Sphere(radius=1.5, center=point)
-        actor = self.app.plotter.add_mesh(sphere, color="cyan", pickable=False)
-        self.align_markers.append(actor)
-        
-        count = len(self.align_points)
+        if mesh is None or self._n_picked >= 3: return
+        self.align_points[self._n_picked] = mesh.points[idx]
+        self._n_picked += 1
+        
+        if self._marker_actor is None: self._build_marker_pipeline()
+        self._marker_points.points = self.align_points[:self._n_picked].copy()
+        self._marker_points.Modified()
+        if not self._markers_shown:
+            self.app.plotter.add_actor(self._marker_actor, pickable=False, reset_camera=False, name="AlignMarkers", render=False)
+            self._markers_shown = True
+        # One rate-limited redraw per pick (add_actor no longer renders on its own)
+        self.app.plotter.update()
+        
+        count = self._n_picked
         if count < 3:
             self.lbl_status.setText(f"Pick Point {count+1}/3")
         else:
@@ -94,52 +187,106 @@ class AlignmentStep(QWidget):
             self.btn_align.setEnabled(True)
             self.app.setup_picking()
 
+    def _build_marker_pipeline(self):
+        """points -> vtkGlyph3D(sphere) -> actor, built once; picks only swap the points."""
+        self._marker_points = pv.PolyData()
+        glyph = vtk.vtkGlyph3D()
+        glyph.SetInputData(self._marker_points)
+        glyph.SetSourceData(pv.Sphere(radius=1.5))
+        glyph.ScalingOff()
+        glyph.OrientOff()
+        
+        mapper = pv.DataSetMapper()
+        mapper.SetInputConnection(glyph.GetOutputPort())
+        mapper.ScalarVisibilityOff()
+        self._marker_actor = pv.Actor(mapper=mapper)
+        self._marker_actor.prop.color = "cyan"
+
     def run_alignment(self):
-        if len(self.align_points) != 3: return
-        p1, p2, p3 = np.array(self.align_points)
-        
-        v1 = p2 - p1
-        v2 = p3 - p1
-        normal = np.cross(v1, v2)
-        normal /= np.linalg.norm(normal)
-        if normal[2] < 0: normal = -normal 
-
-        target = np.array([0.0, 0.0, 1.0])
-        rot_axis = np.cross(normal, target)
-        angle_rad = np.arccos(np.clip(np.dot(normal, target), -1.0, 1.0))
-        
-        matrix = pv.transformations.axis_angle_rotation(rot_axis, np.degrees(angle_rad))
+        if self._n_picked != 3: return
+        R, centroid, ok = align_kernel(*self.align_points)
+        if not ok:
+            self.lbl_status.setText("Points are collinear, pick again.")
+            return
+        self._apply_alignment(R, centroid)
+        self.reset_points()
+        self.app.plotter.reset_camera()
+        self.lbl_status.setText("Aligned to Z-Axis.")
+
+    def toggle_region_tool(self, checked):
+        if checked:
+            if not self.app.active_actor:
+                self.btn_region.setChecked(False)
+                QMessageBox.warning(self, "No Mesh", "Please select a mesh in the scene first.")
+                return
+            if not self.region_tool:
+                self.region_tool = BezierMarkerTool(self.app.plotter, self.app)
+            self.region_tool.start()
+            self.lbl_status.setText("Outline the occlusal region and close the loop.")
+        elif self.region_tool:
+            self.region_tool.stop()
+            self.app.setup_picking()
+
+    def stop_region_tool(self):
+        """Stops the region loop tool and drops its markup; its actor names clash with the wizard bezier tools."""
+        if not self.region_tool: return
+        if self.btn_region.isChecked():
+            self.region_tool.stop()
+            self.btn_region.setChecked(False)
+            self.app.setup_picking()
+        self.region_tool.clear_all_markup()
+        self.region_tool = None
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.stop_region_tool()
+
+    def run_region_alignment(self):
+        if not self.app.active_actor or not self.region_tool: return
+        patch = self.region_tool.get_selected_region()
+        if not patch:
+            QMessageBox.warning(self, "Error", "No closed region found.")
+            return
+        normal, centroid, ok = fit_plane(np.ascontiguousarray(patch.points, dtype=np.float64))
+        if not ok:
+            self.lbl_status.setText("Region is too small for a plane fit.")
+            return
+        self._apply_alignment(rotation_to_z(normal), centroid)
         
+        self.stop_region_tool()
+        self.app.plotter.reset_camera()
+        self.lbl_status.setText("Aligned to Z-Axis (region fit).")
+
+    def _apply_alignment(self, R, centroid):
         actor = self.app.active_actor
         current_mat = self.app._get_matrix_as_array(actor)
         
-        centroid = (p1 + p2 + p3) / 3.0
-        trans_to_origin = np.eye(4); trans_to_origin[:3, 3] = -centroid
-        
-        final_mat = matrix @ trans_to_origin
+        # Rotate about the pick centroid: [R | -R c] composed directly
+        final_mat = np.empty((4, 4))
+        final_mat[:3, :3] = R
+        final_mat[:3, 3] = -R @ centroid
+        final_mat[3] = (0.0, 0.0, 0.0, 1.0)
         new_combined = final_mat @ current_mat
         
-        # Depending on your codebase, TransformCommand might be in core.commands
-        from core.commands import TransformCommand 
         cmd = TransformCommand(self.app, actor, current_mat, new_combined)
         self.app.command_manager.execute(cmd)
-        
-        self.reset_points()
-        self.app.plotter.reset_camera()
-        self.lbl_status.setText("Aligned to Z-Axis.")
 
     def reset_points(self):
-        self.align_points = []
-        for m in self.align_markers: self.app.plotter.remove_actor(m)
-        self.align_markers = []
+        self._n_picked = 0
+        with self.app._defer_render():
+            if self._markers_shown:
+                self.app.plotter.remove_actor(self._marker_actor, render=False)
+                self._markers_shown = False
         self.btn_align.setEnabled(False)
-        self.app.plotter.render()
         self.lbl_status.setText("Points reset.")
 
 # ==========================================
 #       STEP 2: MAXILLARY WORKFLOW
 # ==========================================
 class MaxillarySteps(QWidget):
+    # Toggle buttons unchecked by _stop_active_tools; resolved to widgets once the pages exist
+    _RESET_BUTTONS = ('btn_manual_border', 'btn_papilla', 'btn_sculpt_toggle', 'btn_survey', 'btn_border_tool')
+
     def __init__(self, app_interface):
         super().__init__()
         self.app = app_interface
@@ -149,13 +296,26 @@ class MaxillarySteps(QWidget):
         self.survey_tool = None
         self.sculpt_tool = None
         self.border_tool = None 
+        # Stopped and dropped by _stop_active_tools; the bezier tool persists and is handled there
+        self._managed_tools = ('survey_tool', 'sculpt_tool', 'border_tool')
+        self._reset_buttons = [] # Filled from _RESET_BUTTONS after _init_pages
         
         # --- Data States ---
-        self.pre_cleanup_mesh = None
+        self._undo_snapshot = None # Pre-cleanup _snapshot_mesh(); undo rebuilds from it
         self.last_base_name = None 
         self.incisor_actor = None 
         self.last_border_path = None # Stores the loop from generator
 
+        # --- Slider throttles: a drag emits every step, params are applied at most every 30 ms ---
+        self._param_timer = QTimer(self)
+        self._param_timer.setSingleShot(True)
+        self._param_timer.setInterval(30)
+        self._param_timer.timeout.connect(self.update_sculpt_params)
+        self._border_timer = QTimer(self)
+        self._border_timer.setSingleShot(True)
+        self._border_timer.setInterval(30)
+        self._border_timer.timeout.connect(self.update_border_params)
+
         # --- Layout ---
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(5,5,5,5)
@@ -166,6 +326,7 @@ class MaxillarySteps(QWidget):
         
         # --- Init Pages ---
         self._init_pages()
+        self._reset_buttons = [getattr(self, name) for name in self._RESET_BUTTONS]
         
         # Add stack to layout
         self.layout.addWidget(self.stack)
@@ -189,15 +350,19 @@ class MaxillarySteps(QWidget):
     #       VISIBILITY & CLEANUP
     # ==========================================
     def _on_stack_changed(self, index):
+        # Hidden wizard: showEvent applies the current page when it comes back
+        if not self.isVisible(): return
         # Papilla Visibility
         if hasattr(self, 'page_papilla'):
             is_papilla_page = (self.stack.widget(index) == self.page_papilla)
             self.set_papilla_visibility(is_papilla_page)
 
     def set_papilla_visibility(self, visible):
-        if self.incisor_actor:
-            self.incisor_actor.SetVisibility(visible)
-            self.app.plotter.render()
+        if visible and not self.isVisible(): return
+        # Show/hide and stack changes often repeat the same state; render only on a real change
+        if not self.incisor_actor or bool(self.incisor_actor.GetVisibility()) == visible: return
+        self.incisor_actor.SetVisibility(visible)
+        self.app.plotter.render()
 
     def hideEvent(self, event):
         super().hideEvent(event)
@@ -215,27 +380,15 @@ class MaxillarySteps(QWidget):
             self.bezier_tool.stop()
             self.app.setup_picking()
             
-        # Stop Surveyor
-        if self.survey_tool:
-            self.survey_tool.stop()
-            self.survey_tool = None
-            
-        # Stop Sculptor
-        if self.sculpt_tool:
-            self.sculpt_tool.stop()
-            self.sculpt_tool = None
-        
-        # Stop Border Tool
-        if self.border_tool:
-            self.border_tool.stop()
-            self.border_tool = None
+        # Stop Surveyor / Sculptor / Border Tool
+        for name in self._managed_tools:
+            tool = getattr(self, name)
+            if tool:
+                tool.stop()
+                setattr(self, name, None)
 
         # Reset Buttons
-        if hasattr(self, 'btn_manual_border'): self.btn_manual_border.setChecked(False)
-        if hasattr(self, 'btn_papilla'): self.btn_papilla.setChecked(False)
-        if hasattr(self, 'btn_sculpt_toggle'): self.btn_sculpt_toggle.setChecked(False)
-        if hasattr(self, 'btn_survey'): self.btn_survey.setChecked(False)
-        if hasattr(self, 'btn_border_tool'): self.btn_border_tool.setChecked(False)
+        for btn in self._reset_buttons: btn.setChecked(False)
 
     # ==========================================
     #       PAGE INITIALIZATION
@@ -280,23 +433,21 @@ class MaxillarySteps(QWidget):
         params_group = QGroupBox("Base Parameters"); params_layout = QFormLayout()
         self.slider_height = QSlider(Qt.Horizontal); self.slider_height.setRange(5, 60); self.slider_height.setValue(20)
         self.spin_height = QDoubleSpinBox(); self.spin_height.setRange(5.0, 60.0); self.spin_height.setValue(20.0)
-        self.slider_height.valueChanged.connect(lambda v: self.spin_height.setValue(v))
-        self.spin_height.valueChanged.connect(lambda v: self.slider_height.setValue(int(v)))
+        _link_slider_spin(self.slider_height, self.spin_height)
         h_layout = QHBoxLayout(); h_layout.addWidget(self.slider_height); h_layout.addWidget(self.spin_height)
         params_layout.addRow("Height:", h_layout)
         
         self.slider_skirt = QSlider(Qt.Horizontal); self.slider_skirt.setRange(0, 50); self.slider_skirt.setValue(10)
         self.spin_skirt = QDoubleSpinBox(); self.spin_skirt.setRange(0.0, 5.0); self.spin_skirt.setValue(1.0)
-        self.slider_skirt.valueChanged.connect(lambda v: self.spin_skirt.setValue(v/10.0))
-        self.spin_skirt.valueChanged.connect(lambda v: self.slider_skirt.setValue(int(v*10)))
+        _link_slider_spin(self.slider_skirt, self.spin_skirt, 10.0)
         s_layout = QHBoxLayout(); s_layout.addWidget(self.slider_skirt); s_layout.addWidget(self.spin_skirt)
         params_layout.addRow("Skirt:", s_layout)
         params_group.setLayout(params_layout); l3.addWidget(params_group)
         
-        btn_base = QPushButton("Generate Solid Base")
-        btn_base.setStyleSheet("background-color: #27ae60; color: white; font-weight: bold;")
-        btn_base.clicked.connect(self.generate_base)
-        l3.addWidget(btn_base)
+        self.btn_base = QPushButton("Generate Solid Base")
+        self.btn_base.setStyleSheet("background-color: #27ae60; color: white; font-weight: bold;")
+        self.btn_base.clicked.connect(self.generate_base)
+        l3.addWidget(self.btn_base)
         self.btn_undo_base = QPushButton("Undo Base Generation")
         self.btn_undo_base.setEnabled(False)
         self.btn_undo_base.clicked.connect(self.undo_base)
@@ -349,7 +500,7 @@ class MaxillarySteps(QWidget):
         form = QFormLayout(grp)
         self.slider_inf_radius = QSlider(Qt.Horizontal)
         self.slider_inf_radius.setRange(5, 50); self.slider_inf_radius.setValue(15)
-        self.slider_inf_radius.valueChanged.connect(self.update_border_params)
+        self.slider_inf_radius.valueChanged.connect(lambda *_: self._queue_timer(self._border_timer))
         form.addRow("Influence Radius:", self.slider_inf_radius)
         layout.addWidget(grp)
         
@@ -361,8 +512,6 @@ class MaxillarySteps(QWidget):
         return page
 
     def toggle_border_tool(self, checked):
-        # Local import to prevent circular dependency
-        from tools.border_tool import BorderDeformTool 
         if checked:
             if not self.app.active_actor:
                 self.btn_border_tool.setChecked(False)
@@ -375,8 +524,10 @@ class MaxillarySteps(QWidget):
                 self.btn_border_tool.setChecked(False)
                 return
 
-            if not self.border_tool:
-                self.border_tool = BorderDeformTool(self.app.plotter, self.app.active_actor)
+            # Reuse the tool (and its KD-tree) while it still wraps the active mesh
+            actor = self.app.active_actor
+            if not self.border_tool or self.border_tool.actor is not actor or self.border_tool.mesh is not actor.mapper.dataset:
+                self.border_tool = BorderDeformTool(self.app.plotter, actor)
             
             self.border_tool.set_radius(self.slider_inf_radius.value())
             # PASS THE EXPLICIT PATH HERE
@@ -384,7 +535,6 @@ class MaxillarySteps(QWidget):
         else:
             if self.border_tool:
                 self.border_tool.stop()
-                self.border_tool = None
 
     def update_border_params(self):
         if self.border_tool:
@@ -444,7 +594,7 @@ class MaxillarySteps(QWidget):
         v_sculpt.addWidget(self.chk_dyntopo)
         
         self.slider_detail = QSlider(Qt.Horizontal); self.slider_detail.setRange(1, 100); self.slider_detail.setValue(20)
-        self.slider_detail.valueChanged.connect(self.update_sculpt_params)
+        self.slider_detail.valueChanged.connect(lambda *_: self._queue_timer(self._param_timer))
         v_sculpt.addWidget(QLabel("Detail Level:")); v_sculpt.addWidget(self.slider_detail)
         
         self.radio_group = QButtonGroup()
@@ -456,11 +606,11 @@ class MaxillarySteps(QWidget):
         v_sculpt.addWidget(r_smooth); v_sculpt.addWidget(r_remove); v_sculpt.addWidget(r_add)
         
         self.slider_radius = QSlider(Qt.Horizontal); self.slider_radius.setRange(1, 100); self.slider_radius.setValue(30)
-        self.slider_radius.valueChanged.connect(self.update_sculpt_params)
+        self.slider_radius.valueChanged.connect(lambda *_: self._queue_timer(self._param_timer))
         v_sculpt.addWidget(QLabel("Brush Radius:")); v_sculpt.addWidget(self.slider_radius)
         
         self.slider_power = QSlider(Qt.Horizontal); self.slider_power.setRange(1, 100); self.slider_power.setValue(50)
-        self.slider_power.valueChanged.connect(self.update_sculpt_params)
+        self.slider_power.valueChanged.connect(lambda *_: self._queue_timer(self._param_timer))
         v_sculpt.addWidget(QLabel("Brush Power:")); v_sculpt.addWidget(self.slider_power)
         
         layout.addWidget(grp_sculpt); layout.addStretch()
@@ -475,10 +625,11 @@ class MaxillarySteps(QWidget):
                 QMessageBox.warning(self, "Error", "No mesh loaded.")
                 self.btn_papilla.setChecked(False)
                 return
-            if self.incisor_actor:
-                self.app.plotter.remove_actor(self.incisor_actor)
-                self.incisor_actor = None
-            self.bezier_tool.start()
+            with self.app._defer_render():
+                if self.incisor_actor:
+                    self.app.plotter.remove_actor(self.incisor_actor, render=False)
+                    self.incisor_actor = None
+                self.bezier_tool.start()
         else:
             patch = self.bezier_tool.get_selected_region()
             if patch:
@@ -487,13 +638,13 @@ class MaxillarySteps(QWidget):
             self.bezier_tool.clear_all_markup()
 
     def clear_papilla_mark(self):
-        if self.incisor_actor:
-            self.app.plotter.remove_actor(self.incisor_actor)
-            self.incisor_actor = None
-        self.bezier_tool.stop()
-        self.bezier_tool.clear_all_markup()
+        with self.app._defer_render():
+            if self.incisor_actor:
+                self.app.plotter.remove_actor(self.incisor_actor, render=False)
+                self.incisor_actor = None
+            self.bezier_tool.stop()
+            self.bezier_tool.clear_all_markup()
         self.btn_papilla.setChecked(False)
-        self.app.plotter.render()
 
     def toggle_border_tool_manual(self, checked):
         if checked:
@@ -517,13 +668,16 @@ class MaxillarySteps(QWidget):
             QMessageBox.warning(self, "Error", "No valid selection found.")
             return
 
-        # Handle tuple return (mesh, path)
-        result = ModelGenerator.create_base_from_selection(
-            patch, 
-            base_height=self.spin_height.value(), 
-            skirt_size=self.spin_skirt.value()
-        )
-        
+        # Generate off the UI thread; _on_base_generated receives the (mesh, path) tuple
+        self.btn_base.setEnabled(False)
+        self.setCursor(Qt.BusyCursor)
+        worker = BaseGenWorker(patch, self.spin_height.value(), self.spin_skirt.value())
+        worker.signals.finished.connect(self._on_base_generated)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_base_generated(self, result):
+        self.btn_base.setEnabled(True)
+        self.setCursor(Qt.ArrowCursor)
         if result:
             base_mesh, border_path = result # Unpack the tuple
             
@@ -534,7 +688,7 @@ class MaxillarySteps(QWidget):
             cmd_add = AddMeshCommand(self.app, base_mesh, base_name)
             cmd_clear = self.bezier_tool.clear_markup_cmd()
             
-            composite = MultiCommand([cmd_add, cmd_clear])
+            composite = MultiCommand([cmd_add, cmd_clear], app=self.app)
             self.app.command_manager.execute(composite)
             
             self.last_base_name = base_name 
@@ -560,8 +714,7 @@ class MaxillarySteps(QWidget):
         from utils.generator import auto_patch_craters # Safety import if not global
         patched = auto_patch_craters(mesh, depth_threshold=self.spin_crater_depth.value())
         if patched:
-            self.app.active_actor.mapper.SetInputData(patched)
-            self.app.active_actor.mapper.Update()
+            _replace_mesh(self.app.active_actor, patched)
             self.app.plotter.render()
             QMessageBox.information(self, "Autosmooth", "Patched craters.")
         self.setCursor(Qt.ArrowCursor)
@@ -583,6 +736,10 @@ class MaxillarySteps(QWidget):
             if hasattr(self.app, 'reset_clinical_visuals'):
                 self.app.reset_clinical_visuals()
 
+    def _queue_timer(self, timer):
+        # Already pending: that shot will read the latest slider values
+        if not timer.isActive(): timer.start()
+
     def update_sculpt_params(self, *args):
         if not self.sculpt_tool: return
         text = self.radio_group.checkedButton().text()
@@ -599,21 +756,21 @@ class MaxillarySteps(QWidget):
     def run_cleanup(self):
         if not self.app.active_actor: return
         mesh = self.app.active_actor.mapper.dataset
-        self.pre_cleanup_mesh = mesh.copy()
+        # Plain arrays instead of mesh.copy(): skips VTK's deep copy of the whole dataset
+        self._undo_snapshot = _snapshot_mesh(mesh)
         cleaned = ModelGenerator.clean_undesirable_artifacts(mesh, threshold=self.spin_thresh.value(), rescue_threshold=self.spin_rescue.value())
         if cleaned:
-            self.app.active_actor.mapper.SetInputData(cleaned)
-            self.app.active_actor.mapper.Update()
+            _replace_mesh(self.app.active_actor, cleaned)
             self.app.plotter.render()
             self.btn_undo.setEnabled(True)
             QMessageBox.information(self, "Result", "Cleanup complete.")
 
     def undo_cleanup(self):
-        if self.pre_cleanup_mesh:
-            self.app.active_actor.mapper.SetInputData(self.pre_cleanup_mesh)
+        if self._undo_snapshot is not None:
+            self.app.active_actor.mapper.SetInputData(_restore_mesh(self._undo_snapshot))
             self.app.active_actor.mapper.Update()
             self.app.plotter.render()
-            self.pre_cleanup_mesh = None
+            self._undo_snapshot = None
             self.btn_undo.setEnabled(False)
 
     def toggle_survey(self, checked):
@@ -642,6 +799,9 @@ class MaxillarySteps(QWidget):
 #       STEP 3: MANDIBULAR WORKFLOW
 # ==========================================
 class MandibularSteps(QWidget):
+    # Toggle buttons unchecked by _stop_active_tools; resolved to widgets once the pages exist
+    _RESET_BUTTONS = ('btn_manual_border', 'btn_pad_left', 'btn_pad_right', 'btn_sculpt_toggle', 'btn_survey')
+
     def __init__(self, app_interface):
         super().__init__()
         self.app = app_interface
@@ -650,9 +810,12 @@ class MandibularSteps(QWidget):
         self.bezier_tool = BezierMarkerTool(self.app.plotter, self.app)
         self.survey_tool = None
         self.sculpt_tool = None
+        # Stopped and dropped by _stop_active_tools; the bezier tool persists and is handled there
+        self._managed_tools = ('survey_tool', 'sculpt_tool')
+        self._reset_buttons = [] # Filled from _RESET_BUTTONS after _init_pages
         
         # Data States
-        self.pre_cleanup_mesh = None
+        self._undo_snapshot = None # Pre-cleanup _snapshot_mesh(); undo rebuilds from it
         self.last_base_name = None 
         
         # Mandibular Specific Actors
@@ -660,6 +823,12 @@ class MandibularSteps(QWidget):
         self.pad_right_actor = None
         self.active_pad_side = None # 'left' or 'right' during marking
 
+        # Slider throttle: a drag emits every step, params are applied at most every 30 ms
+        self._param_timer = QTimer(self)
+        self._param_timer.setSingleShot(True)
+        self._param_timer.setInterval(30)
+        self._param_timer.timeout.connect(self.update_sculpt_params)
+
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(5,5,5,5)
 
@@ -667,6 +836,7 @@ class MandibularSteps(QWidget):
         self.stack.currentChanged.connect(self._on_stack_changed)
         
         self._init_pages()
+        self._reset_buttons = [getattr(self, name) for name in self._RESET_BUTTONS]
         self.layout.addWidget(self.stack)
 
         # Navigation
@@ -688,14 +858,21 @@ class MandibularSteps(QWidget):
     #       VISIBILITY LOGIC
     # ==========================================
     def _on_stack_changed(self, index):
+        # Hidden wizard: showEvent applies the current page when it comes back
+        if not self.isVisible(): return
         if hasattr(self, 'page_pads'):
             is_pad_page = (self.stack.widget(index) == self.page_pads)
             self.set_pads_visibility(is_pad_page)
 
     def set_pads_visibility(self, visible):
-        if self.pad_left_actor: self.pad_left_actor.SetVisibility(visible)
-        if self.pad_right_actor: self.pad_right_actor.SetVisibility(visible)
-        self.app.plotter.render()
+        if visible and not self.isVisible(): return
+        # Render only when a pad actually changes state
+        changed = False
+        for actor in (self.pad_left_actor, self.pad_right_actor):
+            if actor and bool(actor.GetVisibility()) != visible:
+                actor.SetVisibility(visible)
+                changed = True
+        if changed: self.app.plotter.render()
 
     def hideEvent(self, event):
         super().hideEvent(event)
@@ -712,25 +889,17 @@ class MandibularSteps(QWidget):
             self.bezier_tool.stop()
             self.app.setup_picking()
             
-        if self.survey_tool:
-            self.survey_tool.stop()
-            self.survey_tool = None
-            
-        if self.sculpt_tool:
-            self.sculpt_tool.stop()
-            self.sculpt_tool = None
-            if hasattr(self.app, 'reset_clinical_visuals'):
-                self.app.reset_clinical_visuals()
-            
-        if hasattr(self, 'btn_sculpt_toggle'): 
-            self.btn_sculpt_toggle.setChecked(False)
+        sculpting = self.sculpt_tool is not None
+        for name in self._managed_tools:
+            tool = getattr(self, name)
+            if tool:
+                tool.stop()
+                setattr(self, name, None)
+        if sculpting and hasattr(self.app, 'reset_clinical_visuals'):
+            self.app.reset_clinical_visuals()
 
         # Reset Buttons
-        if hasattr(self, 'btn_manual_border'): self.btn_manual_border.setChecked(False)
-        if hasattr(self, 'btn_pad_left'): self.btn_pad_left.setChecked(False)
-        if hasattr(self, 'btn_pad_right'): self.btn_pad_right.setChecked(False)
-        if hasattr(self, 'btn_sculpt_toggle'): self.btn_sculpt_toggle.setChecked(False)
-        if hasattr(self, 'btn_survey'): self.btn_survey.setChecked(False)
+        for btn in self._reset_buttons: btn.setChecked(False)
 
     def _init_pages(self):
         # PAGE 1: IMPORT
@@ -775,10 +944,10 @@ class MandibularSteps(QWidget):
         params_layout.addRow("Skirt:", self.spin_skirt)
         params_group.setLayout(params_layout); l3.addWidget(params_group)
         
-        btn_base = QPushButton("Generate Solid Base")
-        btn_base.setStyleSheet("background-color: #8e44ad; color: white; font-weight: bold;")
-        btn_base.clicked.connect(self.generate_base)
-        l3.addWidget(btn_base)
+        self.btn_base = QPushButton("Generate Solid Base")
+        self.btn_base.setStyleSheet("background-color: #8e44ad; color: white; font-weight: bold;")
+        self.btn_base.clicked.connect(self.generate_base)
+        l3.addWidget(self.btn_base)
         
         self.btn_undo_base = QPushButton("Undo Base Generation")
         self.btn_undo_base.setEnabled(False)
@@ -866,7 +1035,7 @@ class MandibularSteps(QWidget):
         v_sculpt.addWidget(self.chk_dyntopo)
         
         self.slider_detail = QSlider(Qt.Horizontal); self.slider_detail.setRange(1, 100); self.slider_detail.setValue(20)
-        self.slider_detail.valueChanged.connect(self.update_sculpt_params)
+        self.slider_detail.valueChanged.connect(lambda *_: self._queue_timer(self._param_timer))
         v_sculpt.addWidget(QLabel("Detail Level:")); v_sculpt.addWidget(self.slider_detail)
         
         self.radio_group = QButtonGroup()
@@ -878,11 +1047,11 @@ class MandibularSteps(QWidget):
         v_sculpt.addWidget(r_smooth); v_sculpt.addWidget(r_remove); v_sculpt.addWidget(r_add)
         
         self.slider_radius = QSlider(Qt.Horizontal); self.slider_radius.setRange(1, 100); self.slider_radius.setValue(30)
-        self.slider_radius.valueChanged.connect(self.update_sculpt_params)
+        self.slider_radius.valueChanged.connect(lambda *_: self._queue_timer(self._param_timer))
         v_sculpt.addWidget(QLabel("Brush Radius:")); v_sculpt.addWidget(self.slider_radius)
         
         self.slider_power = QSlider(Qt.Horizontal); self.slider_power.setRange(1, 100); self.slider_power.setValue(50)
-        self.slider_power.valueChanged.connect(self.update_sculpt_params)
+        self.slider_power.valueChanged.connect(lambda *_: self._queue_timer(self._param_timer))
         v_sculpt.addWidget(QLabel("Brush Power:")); v_sculpt.addWidget(self.slider_power)
         
         layout.addWidget(grp_sculpt); layout.addStretch()
@@ -931,15 +1100,15 @@ class MandibularSteps(QWidget):
             self.active_pad_side = None
 
     def clear_pad_marks(self):
-        if self.pad_left_actor: self.app.plotter.remove_actor(self.pad_left_actor)
-        if self.pad_right_actor: self.app.plotter.remove_actor(self.pad_right_actor)
-        self.pad_left_actor = None
-        self.pad_right_actor = None
-        self.bezier_tool.stop()
-        self.bezier_tool.clear_all_markup()
+        with self.app._defer_render():
+            if self.pad_left_actor: self.app.plotter.remove_actor(self.pad_left_actor, render=False)
+            if self.pad_right_actor: self.app.plotter.remove_actor(self.pad_right_actor, render=False)
+            self.pad_left_actor = None
+            self.pad_right_actor = None
+            self.bezier_tool.stop()
+            self.bezier_tool.clear_all_markup()
         self.btn_pad_left.setChecked(False)
         self.btn_pad_right.setChecked(False)
-        self.app.plotter.render()
 
     # --- BASE GENERATION (INVERTED) ---
     def generate_base(self):
@@ -951,20 +1120,23 @@ class MandibularSteps(QWidget):
         # NOTE: We invert the height to extrude downwards
         inverted_height = -1 * self.spin_height.value()
         
-        # Update: create_base_from_selection now returns a tuple (mesh, path)
-        result = ModelGenerator.create_base_from_selection(
-            patch, 
-            base_height=inverted_height, # Negative for Mandible/Downwards
-            skirt_size=self.spin_skirt.value()
-        )
-        
+        # Generate off the UI thread; _on_base_generated receives the (mesh, path) tuple
+        self.btn_base.setEnabled(False)
+        self.setCursor(Qt.BusyCursor)
+        worker = BaseGenWorker(patch, inverted_height, self.spin_skirt.value()) # Negative for Mandible/Downwards
+        worker.signals.finished.connect(self._on_base_generated)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_base_generated(self, result):
+        self.btn_base.setEnabled(True)
+        self.setCursor(Qt.ArrowCursor)
         if result:
             base_mesh, _ = result # Unpack mesh, ignore path for now
             
             base_name = f"Mandible_Base_{int(time.time())}"
             cmd_add = AddMeshCommand(self.app, base_mesh, base_name)
             cmd_clear = self.bezier_tool.clear_markup_cmd()
-            composite = MultiCommand([cmd_add, cmd_clear])
+            composite = MultiCommand([cmd_add, cmd_clear], app=self.app)
             self.app.command_manager.execute(composite)
             
             self.last_base_name = base_name 
@@ -998,8 +1170,7 @@ class MandibularSteps(QWidget):
         from utils.generator import auto_patch_craters # Safety import
         patched = auto_patch_craters(mesh, depth_threshold=self.spin_crater_depth.value())
         if patched:
-            self.app.active_actor.mapper.SetInputData(patched)
-            self.app.active_actor.mapper.Update()
+            _replace_mesh(self.app.active_actor, patched)
             self.app.plotter.render()
         self.setCursor(Qt.ArrowCursor)
 
@@ -1028,6 +1199,10 @@ class MandibularSteps(QWidget):
             if hasattr(self.app, 'reset_clinical_visuals'):
                 self.app.reset_clinical_visuals()
 
+    def _queue_timer(self, timer):
+        # Already pending: that shot will read the latest slider values
+        if not timer.isActive(): timer.start()
+
     def update_sculpt_params(self, *args):
         if not self.sculpt_tool: return
         text = self.radio_group.checkedButton().text()
@@ -1042,7 +1217,8 @@ class MandibularSteps(QWidget):
         if not self.app.active_actor: return
         
         mesh = self.app.active_actor.mapper.dataset
-        self.pre_cleanup_mesh = mesh.copy()
+        # Plain arrays instead of mesh.copy(): skips VTK's deep copy of the whole dataset
+        self._undo_snapshot = _snapshot_mesh(mesh)
         
         # === FLIPPED VECTOR FOR MANDIBLE ===
         # We pass direction=[0, 0, -1] so the algorithm knows "up" is inverted
@@ -1054,18 +1230,17 @@ class MandibularSteps(QWidget):
         )
         
         if cleaned:
-            self.app.active_actor.mapper.SetInputData(cleaned)
-            self.app.active_actor.mapper.Update()
+            _replace_mesh(self.app.active_actor, cleaned)
             self.app.plotter.render()
             self.btn_undo.setEnabled(True)
             QMessageBox.information(self, "Result", "Mandibular Deep Cleanup complete.")
 
     def undo_cleanup(self):
-        if self.pre_cleanup_mesh:
-            self.app.active_actor.mapper.SetInputData(self.pre_cleanup_mesh)
+        if self._undo_snapshot is not None:
+            self.app.active_actor.mapper.SetInputData(_restore_mesh(self._undo_snapshot))
             self.app.active_actor.mapper.Update()
             self.app.plotter.render()
-            self.pre_cleanup_mesh = None
+            self._undo_snapshot = None
             self.btn_undo.setEnabled(False)
 
     # --- SURVEYOR (MANDIBLE) ---
@@ -1144,21 +1319,15 @@ class DentalWizardSidebar(QWidget):
         # If leaving Alignment
         if index != 1: 
             self.align_wizard.reset_points()
+            self.align_wizard.stop_region_tool()
             
         # If leaving Mandible
         if index != 2:
             self.mandible_wizard._stop_active_tools()
             self.mandible_wizard.set_pads_visibility(False)
 
-        # 2. ACTIVATE NEW PAGE
+        # 2. ACTIVATE NEW PAGE (Qt sends the wizard its showEvent, which restores sub-page actors)
         self.stack.setCurrentIndex(index)
-        
-        # Auto-trigger visibility for actors if returning to specific sub-pages
-        if index == 0:
-            # Trigger showEvent logic manually if needed
-            self.maxilla_wizard.showEvent(None)
-        elif index == 2:
-            self.mandible_wizard.showEvent(None)
 
     def _init_placeholder_page(self, title):
         p = QWidget()
@@ -1,7 +1,9 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QGroupBox, QLabel, 
                                QSlider, QPushButton, QHBoxLayout, QMessageBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 import numpy as np
+import pyvista as pv
+import vtk
 
 class HoleFillDialog(QDialog):
     def __init__(self, parent_app, actor):
@@ -13,7 +15,16 @@ class HoleFillDialog(QDialog):
         self.resize(300, 150)
         self.setModal(False) 
         
-        self.debug_actors = []
+        # Persistent preview: one actor per bucket, fed by an append filter (red = will fill, green = too large)
+        self._red_append, self.red_actor = self._make_bucket_actor('red', 4, True)
+        self._green_append, self.green_actor = self._make_bucket_actor('green', 2, False)
+        self._actors_added = False
+        
+        # Slider drags collapse to one rebuild once the slider rests for 50 ms
+        self._viz_timer = QTimer(self)
+        self._viz_timer.setSingleShot(True)
+        self._viz_timer.setInterval(50)
+        self._viz_timer.timeout.connect(self.update_visualization)
         
         self.boundary_edges = self.mesh.extract_feature_edges(
             boundary_edges=True, feature_edges=False, manifold_edges=False, non_manifold_edges=False
@@ -24,6 +35,7 @@ class HoleFillDialog(QDialog):
             QMessageBox.information(self, "Info", "Mesh is watertight. No holes detected.")
         else:
             self.boundary_strips = self.boundary_edges.connectivity(largest=False)
+        self._region_cache = self._build_region_cache()
         
         self.setup_ui()
         
@@ -60,43 +72,94 @@ class HoleFillDialog(QDialog):
     def on_slider_change(self, val):
         radius = val / 10.0
         self.lbl_size.setText(f"Max Radius: {radius:.1f} mm")
-        self.update_visualization()
+        self._viz_timer.start() # Restart pushes the pending rebuild back
         
-    def update_visualization(self):
-        if self.boundary_strips is None: return
+    def _make_bucket_actor(self, color, line_width, as_tubes):
+        append = vtk.vtkAppendPolyData()
+        mapper = pv.DataSetMapper()
+        mapper.SetInputConnection(append.GetOutputPort())
+        mapper.ScalarVisibilityOff()
+        actor = pv.Actor(mapper=mapper)
+        actor.prop.color = color
+        actor.prop.line_width = line_width
+        actor.prop.render_lines_as_tubes = as_tubes
+        actor.SetPickable(False)
+        actor.SetVisibility(False)
+        return append, actor
 
-        for act in self.debug_actors:
-            self.app.plotter.remove_actor(act)
-        self.debug_actors.clear()
+    def update_visualization(self):
+        if self.boundary_strips is None:
+            self.red_actor.SetVisibility(False)
+            self.green_actor.SetVisibility(False)
+            self.app.plotter.render()
+            return
+        
+        if not self._actors_added:
+            self.app.plotter.add_actor(self.red_actor, pickable=False, reset_camera=False, name="HoleFillRed", render=False)
+            self.app.plotter.add_actor(self.green_actor, pickable=False, reset_camera=False, name="HoleFillGreen", render=False)
+            self._actors_added = True
         
         limit = self.slider.value() / 10.0
         
         try:
-            scalar_name = self.boundary_strips.active_scalars_name
-            if not scalar_name: return 
-
-            region_ids = np.unique(self.boundary_strips[scalar_name])
-            
-            for region_id in region_ids:
-                hole_edge = self.boundary_strips.threshold([region_id, region_id], scalars=scalar_name, preference='point')
-                if hole_edge.n_points == 0: continue
-                
-                bounds = hole_edge.bounds
-                diag = np.sqrt((bounds[1]-bounds[0])**2 + (bounds[3]-bounds[2])**2 + (bounds[5]-bounds[4])**2)
-                radius = diag / 2.0
-                
+            # Only the append inputs change; mappers and actors stay in the scene
+            self._red_append.RemoveAllInputs()
+            self._green_append.RemoveAllInputs()
+            n_red = n_green = 0
+            for hole_edge, radius in self._region_cache:
                 if radius <= limit:
-                    act = self.app.plotter.add_mesh(hole_edge, color='red', line_width=4, render_lines_as_tubes=True, pickable=False)
-                    self.debug_actors.append(act)
+                    self._red_append.AddInputData(hole_edge); n_red += 1
                 else:
-                    act = self.app.plotter.add_mesh(hole_edge, color='green', line_width=2, pickable=False)
-                    self.debug_actors.append(act)
+                    self._green_append.AddInputData(hole_edge); n_green += 1
+            # An append filter without inputs fails to update, so empty buckets are just hidden
+            self.red_actor.SetVisibility(n_red > 0)
+            self.green_actor.SetVisibility(n_green > 0)
                     
             self.app.plotter.render()
         except Exception as e:
             print(f"Viz Error: {e}")
 
 
+    def _build_region_cache(self):
+        """(hole_edge, radius) per boundary loop; the geometry only changes when fill_holes runs."""
+        if self.boundary_strips is None: return []
+        # connectivity() writes RegionId as both point and cell data; indexing the dataset would return the cell array
+        scalar_name = self.boundary_strips.active_scalars_name
+        if not scalar_name or scalar_name not in self.boundary_strips.point_data: return []
+
+        cache = []
+        try:
+            # Per-loop bounding boxes in one pass: group points by region id, reduce each run
+            pts = np.asarray(self.boundary_strips.points)
+            point_region = np.asarray(self.boundary_strips.point_data[scalar_name])
+            region_ids, inverse = np.unique(point_region, return_inverse=True)
+            order = np.argsort(inverse, kind='stable')
+            starts = np.searchsorted(inverse[order], np.arange(len(region_ids)))
+            mins = np.minimum.reduceat(pts[order], starts)
+            maxs = np.maximum.reduceat(pts[order], starts)
+            radii = np.linalg.norm(maxs - mins, axis=1) / 2.0
+            
+            # Split the edge segments by their cell RegionId the same way instead of a threshold() per loop.
+            # Feature edges are 2-point line cells; both label arrays use the same region ids.
+            lines = np.asarray(self.boundary_strips.lines)
+            segs = lines.reshape(-1, 3)[:, 1:]
+            seg_region = np.searchsorted(region_ids, np.asarray(self.boundary_strips.cell_data[scalar_name]))
+            seg_order = np.argsort(seg_region, kind='stable')
+            seg_starts = np.searchsorted(seg_region[seg_order], np.arange(len(region_ids) + 1))
+            
+            for k, radius in enumerate(radii):
+                seg = segs[seg_order[seg_starts[k]:seg_starts[k + 1]]]
+                if len(seg) == 0: continue
+                # Compact to the loop's own points so the append filter doesn't copy the whole set per loop
+                used, local = np.unique(seg.ravel(), return_inverse=True)
+                cells = np.empty((len(seg), 3), dtype=lines.dtype)
+                cells[:, 0] = 2
+                cells[:, 1:] = local.reshape(-1, 2)
+                cache.append((pv.PolyData(pts[used], lines=cells.ravel()), float(radius)))
+        except Exception as e:
+            print(f"Viz Error: {e}")
+        return cache
+
     def fill_holes(self):
         if self.boundary_strips is None: return
         limit = self.slider.value() / 10.0
@@ -123,9 +186,11 @@ class HoleFillDialog(QDialog):
             
             if self.boundary_edges.n_points > 0:
                 self.boundary_strips = self.boundary_edges.connectivity(largest=False)
+                self._region_cache = self._build_region_cache()
                 self.update_visualization()
             else:
                 self.boundary_strips = None
+                self._region_cache = []
                 self.update_visualization()
                 QMessageBox.information(self, "Success", "All holes filled!")
                 
@@ -133,6 +198,9 @@ class HoleFillDialog(QDialog):
             QMessageBox.critical(self, "Error", str(e))
             
     def closeEvent(self, event):
-        for act in self.debug_actors:
-            self.app.plotter.remove_actor(act)
+        self._viz_timer.stop()
+        if self._actors_added:
+            self.app.plotter.remove_actor(self.red_actor, render=False)
+            self.app.plotter.remove_actor(self.green_actor)
+            self._actors_added = False
         super().closeEvent(event)
\ No newline at end of file
@@ -288,6 +288,23 @@ class HierarchyPanel(QWidget):
             parent.removeChild(item)
             del self.items_map[name]
 
+    def remove_many(self, names):
+        # One repaint for the whole batch instead of one per row
+        self.tree.setUpdatesEnabled(False)
+        try:
+            for name in names:
+                self.remove_mesh_item(name)
+        finally:
+            self.tree.setUpdatesEnabled(True)
+
+    def add_many(self, items):
+        self.tree.setUpdatesEnabled(False)
+        try:
+            for name, actor in items:
+                self.add_mesh_item(name, actor)
+        finally:
+            self.tree.setUpdatesEnabled(True)
+
     def select_item(self, name):
         if name in self.items_map:
             item = self.items_map[name]
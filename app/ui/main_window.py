@@ -1,4 +1,5 @@
 import os
+from contextlib import contextmanager
 import numpy as np
 import pyvista as pv
 import vtk
@@ -21,6 +22,7 @@ from app.core.commands import (CommandManager, AddMeshCommand, DeleteMeshCommand
 from app.core.interactors import BrushInteractorStyle
 from app.ui.hierarchy import HierarchyPanel
 from app.ui.dialogs import HoleFillDialog
+from app.utils.alignment import cross3, rotation_to_z
 
 # Project Imports / Mock
 try:
@@ -54,11 +56,13 @@ class MedicalApp(QMainWindow):
         self._snapshot_matrix = None
         self.updating_selection = False
         self.is_processing = False
+        self._render_suspended = False # Set by composite commands to draw once
 
         # 3-Point Plane State
         self.picked_points = []
         self.point_markers = []
         self.plane_actor = None
+        self._plane_marker_template = None # Shared sphere geometry for the pick markers
 
         # Brush State
         self.brush_active = False
@@ -74,6 +78,9 @@ class MedicalApp(QMainWindow):
         
         # 3. UI
         self.setup_ui()
+        # Capability flags checked by commands (the wizard may be the fallback stub)
+        self._has_hierarchy_panel = hasattr(self, 'hierarchy_panel')
+        self._has_dental_wizard = hasattr(self.dental_wizard, 'maxilla_wizard')
         self.setup_lights()
         self.add_infinite_grid()
         self.setup_picking() 
@@ -508,11 +515,11 @@ class MedicalApp(QMainWindow):
         self.ring_transform.Identity()
         self.ring_transform.Translate(offset_pos)
         
-        z_axis = np.array([0.0, 0.0, 1.0])
-        rotation_axis = np.cross(z_axis, normal)
-        rotation_angle = np.degrees(np.arccos(np.dot(z_axis, normal)))
-        
-        self.ring_transform.RotateWXYZ(rotation_angle, rotation_axis)
+        # Ring +Z onto the surface normal: transpose of the normal -> Z rotation (cos/sin come from
+        # the normal itself, so no arccos/degrees round trip and no zero axis when anti-parallel)
+        rot = np.eye(4)
+        rot[:3, :3] = rotation_to_z(normal).T
+        self.ring_transform.Concatenate(rot.ravel().tolist())
         
         self.cursor_ring_actor.SetVisibility(True)
         self.cursor_fill_actor.SetVisibility(True)
@@ -831,7 +838,9 @@ class MedicalApp(QMainWindow):
             self._clear_plane_markers()
             self.picked_points.clear()
         self.picked_points.append(point)
-        marker_mesh = pv.Sphere(radius=2.0, center=point)
+        if self._plane_marker_template is None: self._plane_marker_template = pv.Sphere(radius=2.0)
+        marker_mesh = self._plane_marker_template.copy(deep=False)
+        marker_mesh.points = self._plane_marker_template.points + point
         actor = self.plotter.add_mesh(marker_mesh, color='yellow', pickable=False, reset_camera=False)
         self.point_markers.append(actor)
         if len(self.picked_points) == 3:
@@ -845,7 +854,7 @@ class MedicalApp(QMainWindow):
     def draw_plane_from_points(self):
         p1, p2, p3 = np.array(self.picked_points[0]), np.array(self.picked_points[1]), np.array(self.picked_points[2])
         v1, v2 = p2 - p1, p3 - p1
-        normal = np.cross(v1, v2)
+        normal = cross3(v1, v2)
         norm_mag = np.linalg.norm(normal)
         if norm_mag < 1e-6:
             self._clear_plane_markers()
@@ -1017,15 +1026,35 @@ class MedicalApp(QMainWindow):
         if self.highlight_actor.GetVisibility() != is_visible:
              self.highlight_actor.SetVisibility(is_visible)
 
+    # --- RENDER BATCHING ---
+    @contextmanager
+    def _defer_render(self):
+        """Scene edits inside the block skip drawing; one render on the way out."""
+        renderer = self.plotter.renderer
+        was_drawing = renderer.GetDraw()
+        prev = self._render_suspended
+        renderer.DrawOff()
+        self._render_suspended = True
+        try:
+            yield
+        finally:
+            self._render_suspended = prev
+            if was_drawing: renderer.DrawOn()
+        if not prev: self.plotter.render()
+
     # --- STATE MANAGEMENT ---
     def _get_matrix_as_array(self, actor):
         if not hasattr(actor, "GetMatrix"): return np.eye(4)
         vtk_matrix = actor.GetMatrix()
-        mat = np.eye(4)
-        for i in range(4):
-            for j in range(4):
-                mat[i, j] = vtk_matrix.GetElement(i, j)
-        return mat
+        # The matrix is only rebuilt (and its MTime bumped) when the transform changes
+        mtime = vtk_matrix.GetMTime()
+        cached = getattr(actor, "_cached_mat", None)
+        if cached is not None and cached[0] == mtime: return cached[1].copy()
+        elements = [0.0] * 16
+        vtk.vtkMatrix4x4.DeepCopy(elements, vtk_matrix) # One C-level copy instead of 16 GetElement calls
+        mat = np.array(elements).reshape(4, 4)
+        actor._cached_mat = (mtime, mat)
+        return mat.copy()
 
     def _snapshot_state(self):
         if self.active_actor: self._snapshot_matrix = self._get_matrix_as_array(self.active_actor)
@@ -1295,11 +1324,11 @@ class MedicalApp(QMainWindow):
                 return
 
             # 5. Execute Command (allows Undo)
-            # We copy original_mesh so the undo stack has a preserved state
+            # The command swaps the mapper input, so original_mesh itself is the preserved state
             cmd = ReplaceGeometryCommand(
                 self, 
                 self.active_actor, 
-                original_mesh.copy(), 
+                original_mesh, 
                 largest_part
             )
             self.command_manager.execute(cmd)
@@ -1324,11 +1353,9 @@ class MedicalApp(QMainWindow):
                           self.plotter.remove_actor(self.cursor_patch_actor)
                           self.cursor_patch_actor = None
                     
-                    self.plotter.render() 
-                    
-                    mesh_copy = self.active_actor.mapper.dataset.copy()
-                    
-                    cmd = DeleteCellsCommand(self, self.active_actor, self.brush_indices.copy(), mesh_copy)
+                    self.plotter.render()
+
+                    cmd = DeleteCellsCommand(self, self.active_actor, self.brush_indices)
                     self.command_manager.execute(cmd)
                     
                     self.brush_indices.clear()
@@ -1371,7 +1398,7 @@ class MedicalApp(QMainWindow):
         
         is_node = (self.active_actor.name and "BezierNode" in self.active_actor.name)
         if is_node:
-            if hasattr(self.dental_wizard, 'maxilla_wizard') and self.dental_wizard.maxilla_wizard.bezier_tool:
+            if self._has_dental_wizard and self.dental_wizard.maxilla_wizard.bezier_tool:
                 self.dental_wizard.maxilla_wizard.bezier_tool.delete_node(self.active_actor)
                 self.is_processing = False
                 return 
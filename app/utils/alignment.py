@@ -0,0 +1,69 @@
+import numpy as np
+
+# --- Optional JIT ---
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    def njit(*args, **kwargs):
+        # Plain numpy fallback, same results
+        if args and callable(args[0]): return args[0]
+        return lambda f: f
+
+
+@njit(cache=True)
+def cross3(a, b):
+    """Cross product of two 3-vectors, spelled out (skips np.cross's generic N-D path)."""
+    return np.array((a[1]*b[2] - a[2]*b[1], a[2]*b[0] - a[0]*b[2], a[0]*b[1] - a[1]*b[0]))
+
+
+@njit(cache=True)
+def rotation_to_z(normal):
+    """Rotation taking unit normal onto +Z: R = I + K + K^2 / (1 + n_z), no trig or sqrt."""
+    c = normal[2]
+    R = np.eye(3)
+    if c > 1.0 - 1e-9: return R
+    if c < -1.0 + 1e-9:
+        # Half turn about X
+        R[1, 1] = -1.0; R[2, 2] = -1.0
+        return R
+    # K = skew(normal x Z), left unnormalised: |axis| = sin(theta) folds into the identity
+    K = np.zeros((3, 3))
+    K[0, 2] = -normal[0]; K[1, 2] = -normal[1]
+    K[2, 0] = normal[0]; K[2, 1] = normal[1]
+    return R + K + (K @ K) / (1.0 + c)
+
+
+@njit(cache=True)
+def align_kernel(p1, p2, p3):
+    """
+    Occlusal plane through three picks -> (R, centroid, ok).
+    R rotates the plane normal (flipped to +Z side) onto +Z; ok is False for collinear picks.
+    """
+    centroid = (p1 + p2 + p3) / 3.0
+    normal = cross3(p2 - p1, p3 - p1)
+    n_len = np.sqrt(normal[0]*normal[0] + normal[1]*normal[1] + normal[2]*normal[2])
+    if n_len < 1e-12:
+        return np.eye(3), centroid, False
+    normal = normal / n_len
+    if normal[2] < 0.0: normal = -normal
+    return rotation_to_z(normal), centroid, True
+
+
+@njit(cache=True)
+def fit_plane(points):
+    """
+    Least-squares plane through points -> (normal, centroid, ok).
+    normal is the covariance eigenvector with the smallest eigenvalue, flipped to the +Z side;
+    ok is False when the points don't span a plane.
+    """
+    n = points.shape[0]
+    if n < 3:
+        return np.array([0.0, 0.0, 1.0]), np.zeros(3), False
+    centroid = points.sum(axis=0) / n
+    X = points - centroid
+    w, V = np.linalg.eigh(X.T @ X)
+    normal = V[:, 0].copy()
+    if normal[2] < 0.0: normal = -normal
+    return normal, centroid, w[1] > 1e-12